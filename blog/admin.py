@@ -1,6 +1,6 @@
 from django.contrib import admin
 from markdownx.admin import MarkdownxModelAdmin
-from .models import Post, Category, Tag, Comment
+from .models import Post, Category, Tag, Comment, Task, FailedTask
 
 # Register your models here.
 admin.site.register(Post, MarkdownxModelAdmin)
@@ -13,4 +13,13 @@ class TagAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name', )}
 
 admin.site.register(Category, CategoryAdmin)
-admin.site.register(Tag, TagAdmin)
\ No newline at end of file
+admin.site.register(Tag, TagAdmin)
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'args', 'attempts', 'run_after', 'locked_by')
+
+class FailedTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'args', 'attempts', 'failed_at')
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(FailedTask, FailedTaskAdmin)
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     name = 'blog'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import create_search_index
+        from do_it_django_prj.db import tune_sqlite
+
+        post_migrate.connect(create_search_index, sender=self)
+        connection_created.connect(tune_sqlite, dispatch_uid='tune_sqlite')
@@ -0,0 +1,59 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from allauth.socialaccount.models import SocialAccount
+
+# 작성자 아바타 URL.
+# 예전에는 포스트/댓글마다 socialaccount_set.exists(), first()로 쿼리 2번씩 나갔음
+# -> 한 페이지의 작성자들을 한번에 resolve하고, 사용자별로 캐시에 TTL을 두고 저장함
+
+AVATAR_CACHE_TIMEOUT = getattr(settings, 'BLOG_AVATAR_CACHE_TIMEOUT', 60 * 60)
+
+
+def avatar_cache_key(user_pk):
+    return f'blog:avatar:{user_pk}'
+
+
+def default_avatar_url(user):
+    return f'https://doitdjango.com/avatar/id/205/85a7102a015de50d/svg/{user.email}/'
+
+
+def prefetch_avatar_urls(users):
+    # users의 아바타 URL을 user._avatar_url에 채움. 캐시에 없는 사용자만 SocialAccount를 한번에 조회
+    users_by_key = defaultdict(list)
+    for user in users:
+        if user is not None and not hasattr(user, '_avatar_url'):
+            users_by_key[avatar_cache_key(user.pk)].append(user)
+    if not users_by_key:
+        return
+
+    urls = cache.get_many(list(users_by_key))
+    missing = {key: user_list[0] for key, user_list in users_by_key.items() if key not in urls}
+    if missing:
+        # 기존 socialaccount_set.first()처럼 사용자마다 pk가 가장 작은 계정을 씀
+        accounts = {}
+        for account in SocialAccount.objects.filter(
+            user_id__in=[user.pk for user in missing.values()]
+        ).order_by('-pk'):
+            accounts[account.user_id] = account
+
+        new_urls = {}
+        for key, user in missing.items():
+            account = accounts.get(user.pk)
+            new_urls[key] = (account and account.get_avatar_url()) or default_avatar_url(user)
+        cache.set_many(new_urls, AVATAR_CACHE_TIMEOUT)
+        urls.update(new_urls)
+
+    for key, user_list in users_by_key.items():
+        for user in user_list:
+            user._avatar_url = urls[key]
+
+
+def get_avatar_url(user):
+    if not hasattr(user, '_avatar_url'):
+        prefetch_avatar_urls([user])
+    return user._avatar_url
+
+
+def invalidate_avatar_url(user_pk):
+    cache.delete(avatar_cache_key(user_pk))
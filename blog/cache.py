@@ -0,0 +1,196 @@
+import hashlib
+import time
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import parse_http_date_safe
+from .models import Post, Category
+
+SIDEBAR_VERSION_KEY = 'blog:sidebar:version'
+SIDEBAR_CACHE_TIMEOUT = getattr(settings, 'BLOG_SIDEBAR_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # 캐시에서 밀려나도 예전 버전과 겹치지 않도록 현재 시각으로 시작
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(key, version, None)
+        return version
+
+
+def get_sidebar():
+    # 사이드바의 카테고리 목록과 포스트 수. Post/Category가 바뀌면 signals에서 버전을 올려서 무효화
+    key = f'blog:sidebar:{get_version(SIDEBAR_VERSION_KEY)}'
+    sidebar = cache.get(key)
+    if sidebar is None:
+        sidebar = {
+            'categories': list(Category.objects.all()),
+            'no_category_post_count': Post.objects.filter(category=None).count(),
+        }
+        cache.set(key, sidebar, SIDEBAR_CACHE_TIMEOUT)
+    return sidebar
+
+
+# 로그인하지 않은 사용자에게 보여주는 페이지 전체를 캐시.
+# 키에 들어가는 버전(목록 페이지 / 포스트별 / 사이드바)을 signals에서 올려서, 바뀐 페이지만 무효화함
+
+LIST_PAGES_VERSION_KEY = 'blog:pages:list:version'
+PAGE_CACHE_TIMEOUT = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 60 * 10)
+
+
+def post_pages_version_key(pk):
+    return f'blog:pages:post:{pk}:version'
+
+
+def list_page_versions(request, *args, **kwargs):
+    return [LIST_PAGES_VERSION_KEY]
+
+
+def post_page_versions(request, *args, **kwargs):
+    # 상세 페이지에는 사이드바도 있으므로 사이드바 버전도 같이 봄
+    return [post_pages_version_key(kwargs['pk']), SIDEBAR_VERSION_KEY]
+
+
+def comment_page_versions(request, *args, **kwargs):
+    return [post_pages_version_key(kwargs['pk'])]
+
+
+def get_version_string(keys):
+    return ':'.join(str(get_version(key)) for key in keys)
+
+
+def _is_cacheable(request):
+    return (
+        getattr(settings, 'BLOG_PAGE_CACHE', True)
+        and request.method == 'GET'
+        and not request.user.is_authenticated
+    )
+
+
+def page_cache_key(request, get_version_keys, *args, **kwargs):
+    versions = get_version_string(get_version_keys(request, *args, **kwargs))
+    url_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{versions}:{url_hash}'
+
+
+def get_cached_page(request, cache_key):
+    response = cache.get(cache_key)
+    if response is None:
+        return None
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+        response=response,
+    )
+
+
+def anonymous_page_cache(get_version_keys):
+    # get_version_keys(request, *args, **kwargs): 이 페이지가 의존하는 버전 키 목록
+    # 목록 페이지는 포스트 삭제, 카테고리/태그 변경처럼 updated_at으로 알 수 없는 변경이 있으므로
+    # Last-Modified 없이 내용으로 만든 ETag만 보냄
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            cache_key = page_cache_key(request, get_version_keys, *args, **kwargs)
+            # async_cached_view에서 이미 찾아보고 없었던 경우는 다시 찾지 않음
+            if getattr(request, '_page_cache_miss', None) != cache_key:
+                response = get_cached_page(request, cache_key)
+                if response is not None:
+                    return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.cookies:
+                return response
+
+            def store(response):
+                if request.META.get('CSRF_COOKIE_USED') or response.cookies:
+                    return
+                # view가 직접 validator를 만든 경우(PostDetail)에는 그대로 둠
+                if not response.has_header('ETag'):
+                    response['ETag'] = quote_etag(hashlib.md5(response.content).hexdigest())
+                cache.set(cache_key, response, PAGE_CACHE_TIMEOUT)
+
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_is_local():
+    # 기본 캐시가 이 process의 메모리에 있는지 (읽어도 I/O로 기다리지 않음)
+    return isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def async_cached_view(view_func, get_version_keys):
+    # ASGI용 async view. anonymous_page_cache가 붙은 sync view 앞에서 캐시를 먼저 찾아보고,
+    # 있으면 event loop에서 바로 돌려주고 없을 때만 sync view를 thread에서 실행함.
+    # request.user를 확인하려면 세션(DB)을 읽어야 하므로 세션 쿠키가 없는 요청만 익명으로 봄.
+    # Django 3.2에는 async cache API가 없음. 같은 process의 메모리 캐시는 막히지 않으므로 loop에서 바로 읽고,
+    # 네트워크/파일을 거치는 캐시(redis, memcached ...)는 thread에서 읽어서 event loop를 막지 않음
+    sync_view = sync_to_async(view_func)
+
+    def lookup(request, *args, **kwargs):
+        cache_key = page_cache_key(request, get_version_keys, *args, **kwargs)
+        return cache_key, get_cached_page(request, cache_key)
+
+    async_lookup = sync_to_async(lookup)
+
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if (
+            getattr(settings, 'BLOG_PAGE_CACHE', True)
+            and request.method == 'GET'
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        ):
+            if cache_is_local():
+                cache_key, response = lookup(request, *args, **kwargs)
+            else:
+                cache_key, response = await async_lookup(request, *args, **kwargs)
+            if response is not None:
+                return response
+            request._page_cache_miss = cache_key
+        return await sync_view(request, *args, **kwargs)
+    return wrapper
+
+
+# 템플릿 조각 캐시 ({% post_fragment %}, templatetags/blog_cache.py).
+# 포스트 카드/본문은 (pk, updated_at)로 키를 만들어서, 포스트를 고치면 그 포스트의 조각만 새로 만들어짐.
+# 여러 포스트에 걸친 변경(카테고리/태그 이름)은 FRAGMENTS_VERSION_KEY를 올려서 한번에 버림
+
+FRAGMENTS_VERSION_KEY = 'blog:fragments:version'
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'BLOG_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def fragment_cache_key(name, post, vary_on=(), version=None):
+    if version is None:
+        version = get_version(FRAGMENTS_VERSION_KEY)
+    vary = hashlib.md5(':'.join(str(value) for value in vary_on).encode()).hexdigest()
+    return f'blog:fragment:{version}:{name}:{post.pk}:{post.updated_at.timestamp()}:{vary}'
+
+
+def invalidate_all():
+    # bulk_create/update처럼 signal이 나가지 않는 대량 변경 후에 호출
+    bump_version(SIDEBAR_VERSION_KEY)
+    bump_version(LIST_PAGES_VERSION_KEY)
+    bump_version(FRAGMENTS_VERSION_KEY)
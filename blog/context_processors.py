@@ -0,0 +1,7 @@
+from django.utils.functional import SimpleLazyObject
+from .cache import get_sidebar
+
+
+def sidebar(request):
+    # 사이드바가 없는 페이지에서는 캐시도 읽지 않도록 lazy하게 넘김
+    return {'sidebar': SimpleLazyObject(get_sidebar)}
@@ -0,0 +1,50 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import Post, Category, Tag, Comment
+
+# 목록/사이드바에서 COUNT(*) 대신 읽는 카운터 컬럼.
+# signals에서 F()로 DB 안에서 바로 더하고 빼므로(UPDATE ... SET n = n + 1) 동시에 댓글이 달려도 값이 엇갈리지 않음.
+# bulk_create, queryset.update/delete처럼 signal이 나가지 않는 변경 후에는 reconcile()로 다시 맞춤
+# (manage.py reconcile_counters)
+
+# (카운터가 있는 모델, 컬럼, 세는 모델, 세는 모델에서 카운터 모델을 가리키는 FK)
+COUNTERS = [
+    (Post, 'comment_count', Comment, 'post'),
+    (Category, 'post_count', Post, 'category'),
+    (Tag, 'post_count', Post.tags.through, 'tag'),
+]
+
+
+def adjust(model, field, pks, delta):
+    pks = [pk for pk in pks if pk is not None]
+    if not pks or not delta:
+        return
+    rows = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        # 이미 어긋나 있으면 음수가 되지 않게 건너뜀 (reconcile에서 바로잡음)
+        rows = rows.filter(**{f'{field}__gte': -delta})
+    rows.update(**{field: F(field) + delta})
+
+
+def actual_count(related_model, fk):
+    counts = (
+        related_model.objects.filter(**{fk: OuterRef('pk')})
+        .order_by().values(fk).annotate(n=Count('*')).values('n')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile(dry_run=False):
+    # 모든 카운터 컬럼을 다시 세어서 어긋난 행을 고침. {'<model>.<field>': 틀렸던 행 수}
+    fixed = {}
+    for model, field, related_model, fk in COUNTERS:
+        wrong = list(
+            model.objects.annotate(actual=actual_count(related_model, fk))
+            .exclude(**{field: F('actual')})
+            .values_list('pk', flat=True)
+        )
+        if wrong and not dry_run:
+            # 세는 것과 고치는 것을 한 UPDATE로 해서 그 사이에 달린 댓글도 반영됨
+            model.objects.filter(pk__in=wrong).update(**{field: actual_count(related_model, fk)})
+        fixed[f'{model._meta.model_name}.{field}'] = len(wrong)
+    return fixed
@@ -0,0 +1,276 @@
+import json
+import platform
+import re
+import statistics
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment, override_settings
+
+from blog import synthetic
+from blog.models import Post, Category, Tag, Comment
+
+SERVER_TIMING_QUERIES = re.compile(r'sql;[^,]*desc="(\d+) queries"')
+
+
+class Route:
+    def __init__(self, name, path, method='GET', login=None, data=None):
+        self.name = name
+        self.path = path  # str 또는 요청마다 path를 돌려주는 함수
+        self.method = method
+        self.login = login  # 로그인할 username (None이면 익명)
+        self.data = data
+
+    def get_path(self):
+        return self.path() if callable(self.path) else self.path
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        '가짜 데이터를 만들고 blog/urls.py, single_pages/urls.py의 모든 route를 요청해서 '
+        'p50/p95/p99 응답 시간, 요청당 쿼리 수, 처리량을 측정합니다. 결과를 JSON으로 저장해 이전 결과와 비교할 수 있습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--comments-per-post', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0, help='random seed')
+        parser.add_argument('--requests', type=int, default=50, help='route마다 측정할 요청 수')
+        parser.add_argument('--warmup', type=int, default=5, help='route마다 측정 전에 버릴 요청 수')
+        parser.add_argument('--no-page-cache', action='store_true', help='익명 페이지 캐시를 끄고 측정합니다.')
+        parser.add_argument('--url', default=None,
+                            help='이미 떠 있는 서버(예: http://127.0.0.1:8000)를 HTTP로 측정합니다. '
+                                 '이 경우 설정된 DB의 데이터를 그대로 쓰고, 익명 GET route만 측정합니다.')
+        parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+        parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON 파일')
+        parser.add_argument('--threshold', type=float, default=10.0, help='회귀로 볼 p95 증가율(%%)')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['url']:
+            result = self.run_http(options)
+        else:
+            result = self.run_in_process(options)
+
+        self.print_result(result)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f'saved: {options["output"]}')
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = self.compare(baseline, result, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} route(s) regressed: {", ".join(regressions)}')
+
+    # 측정 대상 route
+
+    def build_routes(self, anonymous_only=False):
+        post_ids = list(Post.objects.order_by('-pk').values_list('pk', flat=True)[:200])
+        if not post_ids:
+            raise CommandError('포스트가 없습니다. 먼저 데이터를 만들어 주세요.')
+        category = Category.objects.order_by('pk').first()
+        tag = Tag.objects.order_by('pk').first()
+        middle_pk = post_ids[len(post_ids) // 2]
+        search_word = Post.objects.get(pk=post_ids[0]).title.split()[0]
+        counter = iter(range(10 ** 9))
+
+        def next_post():
+            return post_ids[next(counter) % len(post_ids)]
+
+        routes = [
+            Route('landing', '/'),
+            Route('about_me', '/about_me/'),
+            Route('post_list', '/blog/'),
+            Route('post_list_page_2', '/blog/?page=2'),
+            Route('post_list_cursor', f'/blog/?after={middle_pk}'),
+            Route('post_detail', lambda: f'/blog/{next_post()}/'),
+            Route('category_page', category.get_absolute_url() if category else '/blog/category/no_category/'),
+            Route('no_category_page', '/blog/category/no_category/'),
+            Route('search', f'/blog/search/{search_word}/'),
+        ]
+        if tag:
+            routes.append(Route('tag_page', tag.get_absolute_url()))
+        if anonymous_only:
+            return routes
+
+        staff = Post.objects.filter(author__is_staff=True).select_related('author').first()
+        if staff is None:
+            return routes
+        username = staff.author.username
+        own_comment_ids = list(Comment.objects.filter(author=staff.author).values_list('pk', flat=True)[:200])
+        deletable = iter(own_comment_ids)
+
+        routes += [
+            Route('post_detail_logged_in', lambda: f'/blog/{next_post()}/', login=username),
+            Route('create_post_form', '/blog/create_post/', login=username),
+            Route('update_post_form', f'/blog/update_post/{staff.pk}/', login=username),
+            Route('new_comment', lambda: f'/blog/{next_post()}/new_comment/', method='POST', login=username,
+                  data={'content': 'benchmark comment'}),
+        ]
+        if own_comment_ids:
+            routes += [
+                Route('update_comment_form', f'/blog/update_comment/{own_comment_ids[-1]}/', login=username),
+                Route('delete_comment', lambda: f'/blog/delete_comment/{next(deletable)}/', login=username),
+            ]
+        return routes
+
+    # 실행
+
+    def run_in_process(self, options):
+        # 실제 DB를 건드리지 않도록 테스트 DB를 만들어서 측정
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            synthetic.seed(
+                users=options['users'], categories=options['categories'], tags=options['tags'],
+                posts=options['posts'], comments_per_post=options['comments_per_post'], random_seed=options['seed'],
+            )
+            self.stdout.write(f'seeded in {time.perf_counter() - started:.1f}s')
+
+            with override_settings(BLOG_PAGE_CACHE=not options['no_page_cache']):
+                clients = {}
+                results = {}
+                for route in self.build_routes():
+                    client = clients.get(route.login)
+                    if client is None:
+                        client = clients[route.login] = Client()
+                        if route.login:
+                            client.login(username=route.login, password='benchmark')
+                    results[route.name] = self.measure(options, lambda: self.client_request(client, route))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        return self.make_result(options, results, mode='client')
+
+    def client_request(self, client, route):
+        with CaptureQueriesContext(connection) as queries:
+            path = route.get_path()
+            if route.method == 'POST':
+                response = client.post(path, route.data)
+            else:
+                response = client.get(path)
+        return response.status_code, len(queries)
+
+    def run_http(self, options):
+        base = options['url'].rstrip('/')
+
+        def http_request(route):
+            try:
+                with urllib.request.urlopen(base + route.get_path()) as response:
+                    response.read()
+                    status, timing = response.status, response.headers.get('Server-Timing', '')
+            except urllib.error.HTTPError as e:
+                status, timing = e.code, e.headers.get('Server-Timing', '')
+            match = SERVER_TIMING_QUERIES.search(timing)
+            return status, int(match.group(1)) if match else None
+
+        results = {}
+        for route in self.build_routes(anonymous_only=True):
+            results[route.name] = self.measure(options, lambda: http_request(route))
+        return self.make_result(options, results, mode='http')
+
+    def measure(self, options, request):
+        samples = []
+        queries = []
+        statuses = set()
+        n = options['warmup'] + options['requests']
+        started = None
+        for i in range(n):
+            if i == options['warmup']:
+                started = time.perf_counter()
+            t = time.perf_counter()
+            try:
+                status, query_count = request()
+            except StopIteration:
+                # delete_comment처럼 지울 댓글이 떨어지면 그만 측정
+                break
+            elapsed = (time.perf_counter() - t) * 1000
+            if i >= options['warmup']:
+                samples.append(elapsed)
+                statuses.add(status)
+                if query_count is not None:
+                    queries.append(query_count)
+        if not samples:
+            return None
+        duration = time.perf_counter() - started
+        return {
+            'requests': len(samples),
+            'status': sorted(statuses),
+            'mean_ms': statistics.mean(samples),
+            'p50_ms': percentile(samples, 0.50),
+            'p95_ms': percentile(samples, 0.95),
+            'p99_ms': percentile(samples, 0.99),
+            'queries': statistics.mean(queries) if queries else None,
+            'throughput_rps': len(samples) / duration if duration else None,
+        }
+
+    def make_result(self, options, results, mode):
+        return {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'mode': mode,
+                'url': options['url'],
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'page_cache': not options['no_page_cache'],
+                'dataset': {
+                    key: options[key] for key in ('users', 'categories', 'tags', 'posts', 'comments_per_post', 'seed')
+                },
+            },
+            'routes': {name: result for name, result in results.items() if result is not None},
+        }
+
+    # 출력
+
+    def print_result(self, result):
+        header = f'{"route":<24} {"reqs":>5} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"req/s":>8}  status'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, r in result['routes'].items():
+            queries = f'{r["queries"]:.1f}' if r['queries'] is not None else '-'
+            self.stdout.write(
+                f'{name:<24} {r["requests"]:>5} {r["p50_ms"]:>8.2f} {r["p95_ms"]:>8.2f} {r["p99_ms"]:>8.2f} '
+                f'{queries:>8} {r["throughput_rps"]:>8.1f}  {",".join(map(str, r["status"]))}'
+            )
+
+    def compare(self, baseline, result, threshold):
+        self.stdout.write('')
+        self.stdout.write(f'{"route":<24} {"p50 Δ%":>8} {"p95 Δ%":>8} {"queries":>12}')
+        regressions = []
+        for name, r in result['routes'].items():
+            old = baseline['routes'].get(name)
+            if old is None:
+                continue
+            p50 = (r['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+            p95 = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+            queries = f'{old["queries"]} -> {r["queries"]}' if old['queries'] != r['queries'] else '='
+            regressed = p95 > threshold or (
+                old['queries'] is not None and r['queries'] is not None and r['queries'] > old['queries']
+            )
+            line = f'{name:<24} {p50:>+8.1f} {p95:>+8.1f} {queries:>12}'
+            if regressed:
+                regressions.append(name)
+                line = self.style.ERROR(line + '  REGRESSION')
+            self.stdout.write(line)
+        return regressions
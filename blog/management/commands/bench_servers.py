@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_blog import percentile
+
+SERVERS = {
+    # WSGI: 요청 하나가 worker thread 하나를 차지함
+    'gunicorn': lambda port, options: [
+        'gunicorn', 'do_it_django_prj.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(options['workers']),
+        '--worker-class', 'gthread', '--threads', str(options['threads']), '--log-level', 'warning',
+    ],
+    # ASGI: asgi.py가 DJANGO_ASYNC_VIEWS=1로 async view를 연결함
+    'uvicorn': lambda port, options: [
+        'uvicorn', 'do_it_django_prj.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--workers', str(options['workers']), '--log-level', 'warning',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        '임시 sqlite DB에 가짜 데이터를 만들고 gunicorn(WSGI)과 uvicorn(ASGI, async view)을 차례로 띄워서 '
+        '읽기 페이지들에 동시 요청을 보내 처리량(req/s)과 p50/p95/p99 응답 시간을 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default='gunicorn,uvicorn')
+        parser.add_argument('--workers', type=int, default=2, help='서버 process 수')
+        parser.add_argument('--threads', type=int, default=4, help='gunicorn worker당 thread 수')
+        parser.add_argument('--concurrency', type=int, default=32, help='동시에 보내는 요청 수')
+        parser.add_argument('--duration', type=float, default=10.0, help='서버마다 측정할 시간(초)')
+        parser.add_argument('--warmup', type=float, default=2.0, help='측정 전에 요청을 보내는 시간(초)')
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+
+    def handle(self, *args, **options):
+        servers = [name.strip() for name in options['servers'].split(',') if name.strip()]
+        for name in servers:
+            if name not in SERVERS:
+                raise CommandError(f'알 수 없는 서버: {name}')
+            if shutil.which(name) is None:
+                raise CommandError(f'{name}이(가) 설치되어 있지 않습니다. pip install {name}')
+
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'do_it_django_prj.settings.dev',
+                'SQLITE_PATH': os.path.join(directory, 'bench.sqlite3'),
+                'DJANGO_SQLITE_TUNING': '1',  # 여러 worker process가 같은 파일을 읽음
+            }
+            self.manage(env, 'migrate', '-v', '0')
+            self.manage(env, 'seed_blog', '--posts', str(options['posts']), '--users', '10', '--tags', '50',
+                        '--categories', '10', '--comments-per-post', '5')
+            paths = self.build_paths(env['SQLITE_PATH'])
+
+            results = {}
+            for name in servers:
+                results[name] = self.run_server(name, env, paths, options)
+
+        self.print_results(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'saved: {options["output"]}')
+
+    def manage(self, env, *args):
+        subprocess.run([sys.executable, 'manage.py', *args], cwd=settings.BASE_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def build_paths(self, db_path):
+        with sqlite3.connect(db_path) as db:
+            post_ids = [row[0] for row in db.execute('SELECT id FROM blog_post ORDER BY id DESC LIMIT 200')]
+            category = db.execute('SELECT slug FROM blog_category ORDER BY id LIMIT 1').fetchone()
+            tag = db.execute('SELECT slug FROM blog_tag ORDER BY id LIMIT 1').fetchone()
+        paths = ['/', '/blog/', '/blog/?page=2', '/blog/category/no_category/']
+        paths += [f'/blog/{pk}/' for pk in post_ids]
+        if category:
+            paths.append(f'/blog/category/{category[0]}/')
+        if tag:
+            paths.append(f'/blog/tag/{tag[0]}/')
+        return paths
+
+    def run_server(self, name, env, paths, options):
+        port = free_port()
+        process = subprocess.Popen(SERVERS[name](port, options), cwd=settings.BASE_DIR, env=env)
+        try:
+            self.wait_until_ready(port, process)
+            asyncio.run(self.load(port, paths, options['concurrency'], options['warmup']))
+            samples, statuses, elapsed = asyncio.run(
+                self.load(port, paths, options['concurrency'], options['duration'])
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        if not samples:
+            raise CommandError(f'{name}: 응답을 하나도 받지 못했습니다.')
+        return {
+            'requests': len(samples),
+            'throughput_rps': len(samples) / elapsed,
+            'p50_ms': percentile(samples, 0.50),
+            'p95_ms': percentile(samples, 0.95),
+            'p99_ms': percentile(samples, 0.99),
+            'errors': sum(count for status, count in statuses.items() if status != 200),
+        }
+
+    def wait_until_ready(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError('서버가 시작하지 못했습니다.')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/about_me/', timeout=1):
+                    return
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.2)
+        raise CommandError('서버가 시간 안에 뜨지 않았습니다.')
+
+    async def load(self, port, paths, concurrency, duration):
+        # keep-alive connection을 concurrency개 열어서 각자 쉬지 않고 GET을 보냄
+        samples = []
+        statuses = {}
+        deadline = time.monotonic() + duration
+        counter = iter(range(10 ** 9))
+
+        async def client():
+            reader = writer = None
+            while time.monotonic() < deadline:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                path = paths[next(counter) % len(paths)]
+                started = time.perf_counter()
+                writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n'.encode())
+                try:
+                    status, keep_alive = await self.read_response(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    writer.close()
+                    reader = writer = None
+                    continue
+                samples.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+                if not keep_alive:
+                    writer.close()
+                    reader = writer = None
+            if writer is not None:
+                writer.close()
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return samples, statuses, time.monotonic() - started
+
+    async def read_response(self, reader):
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await reader.read()
+            return status, False
+        return status, headers.get('connection', '').lower() != 'close'
+
+    def print_results(self, results):
+        header = f'{"server":<10} {"reqs":>7} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, r in results.items():
+            self.stdout.write(
+                f'{name:<10} {r["requests"]:>7} {r["throughput_rps"]:>9.1f} {r["p50_ms"]:>8.2f} '
+                f'{r["p95_ms"]:>8.2f} {r["p99_ms"]:>8.2f} {r["errors"]:>7}'
+            )
@@ -0,0 +1,133 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, OperationalError
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+
+from blog import synthetic
+from blog.models import Post, Comment
+from blog.views import get_post_queryset
+from .bench_blog import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        '임시 sqlite 파일 DB에서 reader thread들이 포스트 상세(포스트 + 댓글)를 읽는 동안 writer thread들이 '
+        '댓글을 쓰게 하고, SQLITE_TUNING(WAL 등)을 끈 경우와 켠 경우의 읽기/쓰기 처리량과 지연 시간을 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0, help='모드마다 측정할 시간(초)')
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--comments-per-post', type=int, default=5)
+        parser.add_argument('--mode', choices=['both', 'off', 'on'], default='both')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('sqlite DB에서만 의미가 있습니다.')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            # thread마다 connection을 따로 열어야 하므로 in-memory가 아닌 파일 DB로 만듦
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(directory, 'bench.sqlite3')
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                seeded = synthetic.seed(
+                    users=5, categories=5, tags=50, posts=options['posts'],
+                    comments_per_post=options['comments_per_post'], index=False,
+                )
+                modes = ['off', 'on'] if options['mode'] == 'both' else [options['mode']]
+                results = {mode: self.run(mode, seeded, options) for mode in modes}
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        self.print_results(results)
+
+    def run(self, mode, seeded, options):
+        connections.close_all()
+        with override_settings(SQLITE_TUNING=(mode == 'on')):
+            if mode == 'off':
+                # journal_mode=wal은 파일에 남으므로 기본값으로 되돌림
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode = delete')
+                connection.close()
+
+            stop = threading.Event()
+            stats = {'read': [], 'write': [], 'read_errors': 0, 'write_errors': 0}
+            lock = threading.Lock()
+
+            def worker(kind, seed):
+                rng = random.Random(seed)
+                samples = []
+                errors = 0
+                try:
+                    while not stop.is_set():
+                        pk = rng.choice(seeded['posts'])
+                        started = time.perf_counter()
+                        try:
+                            if kind == 'read':
+                                # PostDetail의 쿼리
+                                post = get_post_queryset().get(pk=pk)
+                                list(post.comment_set.select_related('author').order_by('created_at', 'pk'))
+                            else:
+                                # new_comment의 쓰기
+                                Comment.objects.create(post_id=pk, author_id=rng.choice(seeded['users']),
+                                                       content='benchmark comment')
+                        except OperationalError:
+                            errors += 1
+                            continue
+                        samples.append((time.perf_counter() - started) * 1000)
+                finally:
+                    connections.close_all()
+                with lock:
+                    stats[kind].extend(samples)
+                    stats[f'{kind}_errors'] += errors
+
+            threads = [threading.Thread(target=worker, args=('read', i)) for i in range(options['readers'])]
+            threads += [threading.Thread(target=worker, args=('write', 1000 + i)) for i in range(options['writers'])]
+            for thread in threads:
+                thread.start()
+            time.sleep(options['duration'])
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+
+        result = {'journal_mode': journal_mode}
+        for kind in ('read', 'write'):
+            samples = stats[kind]
+            result[kind] = {
+                'count': len(samples),
+                'per_second': len(samples) / options['duration'],
+                'mean_ms': statistics.mean(samples) if samples else None,
+                'p95_ms': percentile(samples, 0.95) if samples else None,
+                'errors': stats[f'{kind}_errors'],
+            }
+        return result
+
+    def print_results(self, results):
+        header = f'{"tuning":<8} {"journal":<8} {"kind":<6} {"ops":>7} {"ops/s":>9} {"mean ms":>9} {"p95 ms":>9} {"errors":>7}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for mode, result in results.items():
+            for kind in ('read', 'write'):
+                r = result[kind]
+                mean = f'{r["mean_ms"]:.2f}' if r['mean_ms'] is not None else '-'
+                p95 = f'{r["p95_ms"]:.2f}' if r['p95_ms'] is not None else '-'
+                self.stdout.write(
+                    f'{mode:<8} {result["journal_mode"]:<8} {kind:<6} {r["count"]:>7} {r["per_second"]:>9.1f} '
+                    f'{mean:>9} {p95:>9} {r["errors"]:>7}'
+                )
@@ -0,0 +1,111 @@
+import json
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+
+from blog import synthetic
+from blog.models import Post
+from do_it_django_prj.templates import template_loaders, warm_templates
+
+from .bench_blog import percentile
+
+SERVER_TIMING_TEMPLATE = re.compile(r'tpl;dur=([\d.]+)')
+
+
+def templates_setting(cached):
+    # 지금 설정에서 loaders만 바꾼 TEMPLATES
+    config = dict(settings.TEMPLATES[0])
+    config.pop('APP_DIRS', None)
+    config['OPTIONS'] = dict(config.get('OPTIONS', {}), loaders=template_loaders(cached))
+    return [config] + list(settings.TEMPLATES[1:])
+
+
+class Command(BaseCommand):
+    help = (
+        '임시 DB에 가짜 데이터를 만들고 post_list.html, post_detail.html을 렌더링하는 요청을 보내서 '
+        '요청당 템플릿 시간(로딩+렌더링, Server-Timing의 tpl)을 cached loader를 끈 경우와 켠 경우로 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0, help='random seed')
+        parser.add_argument('--requests', type=int, default=200, help='페이지마다 측정할 요청 수')
+        parser.add_argument('--fragment-cache', action='store_true',
+                            help='조각 캐시를 켠 채로 측정합니다. (기본은 꺼서 템플릿 전체를 매번 렌더링)')
+        parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            synthetic.seed(
+                users=5, categories=5, tags=20, posts=options['posts'], comments_per_post=3,
+                random_seed=options['seed'],
+            )
+            post_ids = list(Post.objects.order_by('-pk').values_list('pk', flat=True))
+            result = {}
+            for cached in (False, True):
+                with override_settings(
+                    TEMPLATES=templates_setting(cached), BLOG_PAGE_CACHE=False,
+                    BLOG_FRAGMENT_CACHE=options['fragment_cache'],
+                ):
+                    result['cached' if cached else 'uncached'] = self.measure(options, post_ids)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.print_result(result)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(f'saved: {options["output"]}')
+
+    def measure(self, options, post_ids):
+        started = time.perf_counter()
+        warmed = warm_templates()
+        warm_ms = (time.perf_counter() - started) * 1000
+
+        client = Client()
+        pages = {
+            'post_list': lambda i: '/blog/',
+            'post_detail': lambda i: f'/blog/{post_ids[i % len(post_ids)]}/',
+        }
+        result = {'warm_templates': warmed, 'warm_ms': warm_ms}
+        for name, path in pages.items():
+            samples = []
+            for i in range(options['requests']):
+                response = client.get(path(i))
+                samples.append(float(SERVER_TIMING_TEMPLATE.search(response['Server-Timing']).group(1)))
+            result[name] = {
+                # 첫 요청: cached loader를 켜도 warm_templates를 하지 않았다면 여기서 파싱함
+                'first_ms': samples[0],
+                'mean_ms': statistics.mean(samples[1:]),
+                'p50_ms': percentile(samples[1:], 0.50),
+                'p95_ms': percentile(samples[1:], 0.95),
+            }
+        return result
+
+    def print_result(self, result):
+        header = f'{"loader":<10} {"page":<12} {"first ms":>9} {"mean ms":>8} {"p50 ms":>8} {"p95 ms":>8}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for loader, pages in result.items():
+            for name in ('post_list', 'post_detail'):
+                r = pages[name]
+                self.stdout.write(
+                    f'{loader:<10} {name:<12} {r["first_ms"]:>9.2f} {r["mean_ms"]:>8.2f} '
+                    f'{r["p50_ms"]:>8.2f} {r["p95_ms"]:>8.2f}'
+                )
+        cached = result['cached']
+        self.stdout.write(f'\nwarm_templates: {cached["warm_templates"]} templates in {cached["warm_ms"]:.1f} ms')
+        for name in ('post_list', 'post_detail'):
+            before, after = result['uncached'][name]['mean_ms'], cached[name]['mean_ms']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(f'{name}: {before:.2f} -> {after:.2f} ms per request ({change:+.1f}%)')
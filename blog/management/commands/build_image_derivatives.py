@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog import thumbnails
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = '기존 포스트들의 head_image에 대해 크기별 WebP/JPEG 파일(derivative)을 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='이미 있는 파일도 다시 만듭니다.')
+
+    def handle(self, *args, **options):
+        names = (
+            Post.objects.exclude(head_image='').order_by('head_image')
+            .values_list('head_image', flat=True).distinct()
+        )
+        done = failed = 0
+        for name in names.iterator():
+            try:
+                thumbnails.generate_derivatives(name, force=options['force'])
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f'{name}: {e}')
+                continue
+            done += 1
+            if done % 100 == 0:
+                self.stdout.write(f'{done} images')
+        self.stdout.write(self.style.SUCCESS(f'{done} images done, {failed} failed'))
@@ -0,0 +1,58 @@
+import os
+import shutil
+
+from django.core.management.base import BaseCommand
+from do_it_django_prj import perf
+
+
+class Command(BaseCommand):
+    help = 'PerformanceMiddleware가 모은 view별 요청 통계(쿼리 수, SQL/템플릿/전체 시간, 조각 캐시 적중률)를 보여줍니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='histogram 파일 디렉토리 (기본: PERF_STATS_DIR)')
+        parser.add_argument('--sort', default='total', choices=['total', 'count', 'sql', 'p95'])
+        parser.add_argument('--reset', action='store_true', help='출력 후 모은 통계를 지웁니다.')
+
+    def handle(self, *args, **options):
+        stats_dir = options['dir'] or perf.get_stats_dir()
+        views = perf.load_stats(stats_dir)
+        if not views:
+            self.stdout.write(f'{stats_dir}: 기록된 요청이 없습니다.')
+            return
+
+        rows = []
+        for view_name, stats in views.items():
+            count = stats['count']
+            fragments = stats.get('fragment_hits', 0) + stats.get('fragment_misses', 0)
+            rows.append({
+                'view': view_name,
+                'count': count,
+                'total': stats['total_ms'] / count,
+                'sql': stats['sql_count'] / count,
+                'sql_ms': stats['sql_ms'] / count,
+                'tpl_ms': stats['template_ms'] / count,
+                'p50': perf.percentile(stats['buckets'], 0.5),
+                'p95': perf.percentile(stats['buckets'], 0.95),
+                'p99': perf.percentile(stats['buckets'], 0.99),
+                # {% post_fragment %}를 쓰지 않는 view는 '-'
+                'frag': f'{100 * stats["fragment_hits"] / fragments:.0f}%' if fragments else '-',
+            })
+        sort_keys = {
+            'total': lambda row: row['total'] * row['count'],  # view가 쓴 전체 시간
+            'count': lambda row: row['count'],
+            'sql': lambda row: row['sql'],
+            'p95': lambda row: row['p95'],
+        }
+        rows.sort(key=sort_keys[options['sort']], reverse=True)
+
+        header = f'{"view":<45} {"reqs":>7} {"avg ms":>8} {"p50<=":>7} {"p95<=":>7} {"p99<=":>7} {"queries":>8} {"sql ms":>8} {"tpl ms":>8} {"frag hit":>8}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in rows:
+            self.stdout.write(
+                f'{row["view"]:<45} {row["count"]:>7} {row["total"]:>8.1f} {row["p50"]:>7} {row["p95"]:>7} '
+                f'{row["p99"]:>7} {row["sql"]:>8.1f} {row["sql_ms"]:>8.1f} {row["tpl_ms"]:>8.1f} {row["frag"]:>8}'
+            )
+
+        if options['reset'] and os.path.isdir(stats_dir):
+            shutil.rmtree(stats_dir)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from blog import search
+
+
+class Command(BaseCommand):
+    help = '포스트 검색 인덱스(sqlite FTS5 / postgresql tsvector)를 처음부터 다시 만듭니다.'
+
+    def handle(self, *args, **options):
+        backend = search.BACKENDS.get(connection.vendor)
+        if backend is None:
+            raise CommandError(f'{connection.vendor}: 검색 인덱스를 지원하지 않는 데이터베이스입니다.')
+
+        search.create_search_index()
+        if search.get_backend() is None:
+            raise CommandError('검색 인덱스 테이블을 만들 수 없습니다. (sqlite 3.34 이상의 FTS5 trigram이 필요합니다)')
+
+        with transaction.atomic():
+            count = search.reindex_all(clear=True)
+
+        self.stdout.write(self.style.SUCCESS(f'{count} posts indexed'))
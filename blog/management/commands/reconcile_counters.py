@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from blog import counters
+from blog.cache import invalidate_all
+
+
+class Command(BaseCommand):
+    help = '댓글 수(Post.comment_count), 포스트 수(Category/Tag.post_count) 카운터를 실제 개수와 비교해서 어긋난 것을 고칩니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='고치지 않고 어긋난 행 수만 보여줍니다.')
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile(dry_run=options['dry_run'])
+        for name, count in fixed.items():
+            self.stdout.write(f'{name}: {count} row(s) {"out of sync" if options["dry_run"] else "fixed"}')
+        if any(fixed.values()) and not options['dry_run']:
+            # 사이드바/목록 캐시에 옛 숫자가 남아 있음
+            invalidate_all()
+        self.stdout.write(self.style.SUCCESS('done'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from blog.cache import bump_version, invalidate_all, post_pages_version_key
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Post.content를 다시 markdown으로 변환해서 content_html, content_excerpt에 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--only-missing', action='store_true',
+                            help='content_html이 비어 있는 포스트만 변환합니다.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('pk', 'content', 'content_html', 'content_excerpt').order_by('pk')
+        if options['only_missing']:
+            posts = posts.filter(content_html='')
+
+        batch = []
+        count = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            rendered = (post.content_html, post.content_excerpt)
+            post.render_content()
+            if (post.content_html, post.content_excerpt) == rendered:
+                continue
+            batch.append(post)
+            if len(batch) >= batch_size:
+                count += self._flush(batch)
+                batch = []
+        if batch:
+            count += self._flush(batch)
+        if count:
+            # updated_at이 그대로라 조각 캐시 키도 그대로이므로 목록/조각 캐시를 한번에 버림
+            invalidate_all()
+
+        self.stdout.write(self.style.SUCCESS(f'{count} posts rendered'))
+
+    def _flush(self, batch):
+        # save() 대신 bulk_update를 써서 updated_at이 바뀌지 않게 함
+        with transaction.atomic():
+            Post.objects.bulk_update(batch, ['content_html', 'content_excerpt'])
+        for post in batch:
+            bump_version(post_pages_version_key(post.pk))
+        return len(batch)
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import tasks
+from blog.models import Task, FailedTask
+
+
+class Command(BaseCommand):
+    help = 'blog.tasks 작업 큐의 worker. 대기 중인 작업을 꺼내서 실행하고, 실패하면 다시 시도하거나 FailedTask로 옮깁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='지금 실행할 수 있는 작업을 모두 처리하고 끝냅니다.')
+        parser.add_argument('--batch-size', type=int, default=10, help='한번에 가져올 작업 수')
+        parser.add_argument('--sleep', type=float, default=1.0, help='작업이 없을 때 기다릴 시간(초)')
+        parser.add_argument('--requeue-failed', action='store_true', help='FailedTask의 작업을 큐에 다시 넣고 끝냅니다.')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            self.stdout.write(f'{tasks.requeue_failed()} task(s) requeued')
+            return
+
+        worker_id = tasks.default_worker_id()
+        self.stdout.write(f'worker {worker_id}: {Task.objects.count()} queued, {FailedTask.objects.count()} failed')
+        try:
+            while True:
+                # 오래 도는 process이므로 요청처럼 매번 끊긴/오래된 connection을 정리
+                close_old_connections()
+                succeeded, failed = tasks.run_pending(worker_id, options['batch_size'])
+                if succeeded or failed:
+                    self.stdout.write(f'{succeeded} succeeded, {failed} failed')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_old_connections()
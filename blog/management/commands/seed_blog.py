@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from blog import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        '부하 테스트용 가짜 데이터(사용자, 카테고리, 태그, 포스트, 댓글)를 bulk_create로 대량 생성합니다. '
+        '같은 --seed면 같은 데이터가 만들어집니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--tags', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments-per-post', type=int, default=10, help='포스트당 평균 댓글 수')
+        parser.add_argument('--tags-per-post', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0, help='random seed')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='한 transaction에서 만들 포스트 수 (메모리 사용량이 이 값에 비례)')
+        parser.add_argument('--head-images', type=int, default=0,
+                            help='포스트들이 나눠 쓸 placeholder head_image 파일 수 (0이면 이미지 없음)')
+        parser.add_argument('--no-index', action='store_true',
+                            help='검색 인덱스를 갱신하지 않습니다. (나중에 rebuild_search_index 실행)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size는 1 이상이어야 합니다.')
+        started = time.perf_counter()
+
+        def progress(created):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{created["posts"]}/{options["posts"]} posts, {created["comments"]} comments, '
+                f'{created["tag_links"]} tag links ({created["posts"] / elapsed:.0f} posts/s)'
+            )
+
+        result = synthetic.seed(
+            users=options['users'],
+            categories=options['categories'],
+            tags=options['tags'],
+            posts=options['posts'],
+            comments_per_post=options['comments_per_post'],
+            tags_per_post=options['tags_per_post'],
+            random_seed=options['seed'],
+            batch_size=options['batch_size'],
+            head_images=options['head_images'],
+            index=not options['no_index'],
+            progress=progress,
+        )
+        created = result['created']
+        self.stdout.write(self.style.SUCCESS(
+            f'created {created["posts"]} posts, {created["comments"]} comments, {created["tag_links"]} tag links '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,84 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 새 process에서 worker와 똑같이 wsgi.py를 import하고 startup.boot()이 잰 값을 돌려줌
+CHILD = '''
+import json
+from do_it_django_prj import startup, wsgi
+print(json.dumps({
+    'boot_ms': startup.boot_ms,
+    'phases': startup.phase_timings,
+    'apps': startup.app_timings,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        '새 python process에서 wsgi.py를 import해서(gunicorn worker가 뜨는 것과 같음) 시작 시간을 단계별, '
+        'INSTALLED_APPS별로 측정합니다. STARTUP_BUDGET_MS를 넘으면 알려주고, --fail-over-budget이면 실패합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='측정할 횟수 (중앙값을 보여줌)')
+        parser.add_argument('--budget', type=float, default=None, help='ms. 기본은 settings.STARTUP_BUDGET_MS')
+        parser.add_argument('--fail-over-budget', action='store_true')
+        parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+
+    def handle(self, *args, **options):
+        # 자식 process는 이 명령과 같은 설정(--settings, DJANGO_SETTINGS_MODULE)으로 뜸
+        env = dict(os.environ)
+        runs = []
+        for _ in range(options['runs']):
+            started = time.perf_counter()
+            child = subprocess.run(
+                [sys.executable, '-c', CHILD], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            process_ms = (time.perf_counter() - started) * 1000
+            if child.returncode != 0:
+                raise CommandError(f'worker failed to start:\n{child.stderr}')
+            run = json.loads(child.stdout.strip().splitlines()[-1])
+            run['process_ms'] = process_ms  # python 시작, site-packages 포함
+            runs.append(run)
+
+        result = {
+            'settings': env['DJANGO_SETTINGS_MODULE'],
+            'process_ms': statistics.median(run['process_ms'] for run in runs),
+            'boot_ms': statistics.median(run['boot_ms'] for run in runs),
+            'phases': {name: statistics.median(run['phases'][name] for run in runs) for name in runs[0]['phases']},
+            'apps': {label: statistics.median(run['apps'][label] for run in runs) for label in runs[0]['apps']},
+        }
+        budget = options['budget'] if options['budget'] is not None else getattr(settings, 'STARTUP_BUDGET_MS', None)
+        self.print_result(result, budget)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(f'saved: {options["output"]}')
+        if budget and result['boot_ms'] > budget and options['fail_over_budget']:
+            raise CommandError(f'startup took {result["boot_ms"]:.0f}ms, over the {budget:.0f}ms budget')
+
+    def print_result(self, result, budget):
+        self.stdout.write(f'settings: {result["settings"]} ({len(result["apps"])} apps)')
+        self.stdout.write(f'{"phase":<24} {"ms":>8}')
+        self.stdout.write('-' * 33)
+        for name, ms in result['phases'].items():
+            self.stdout.write(f'{name:<24} {ms:>8.1f}')
+        self.stdout.write('')
+        self.stdout.write(f'{"app":<24} {"ms":>8}')
+        self.stdout.write('-' * 33)
+        for label, ms in sorted(result['apps'].items(), key=lambda item: item[1], reverse=True):
+            self.stdout.write(f'{label:<24} {ms:>8.1f}')
+        self.stdout.write('')
+        line = f'boot: {result["boot_ms"]:.1f} ms (process: {result["process_ms"]:.1f} ms)'
+        if budget:
+            over = result['boot_ms'] > budget
+            line += f', budget {budget:.0f} ms'
+            line = self.style.ERROR(line + '  OVER BUDGET') if over else line
+        self.stdout.write(line)
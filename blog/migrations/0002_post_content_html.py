@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        # 기존 포스트는 비어 있음 -> manage.py render_post_content --only-missing 로 채움
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
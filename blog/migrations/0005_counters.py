@@ -0,0 +1,48 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    # 기존 데이터의 카운터를 한번 세어서 채움 (이후에는 signals가 갱신)
+    Post = apps.get_model('blog', 'Post')
+    Category = apps.get_model('blog', 'Category')
+    Tag = apps.get_model('blog', 'Tag')
+    Comment = apps.get_model('blog', 'Comment')
+
+    def count(model, fk):
+        return Coalesce(Subquery(
+            model.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(n=Count('*')).values('n')
+        ), 0)
+
+    Post.objects.update(comment_count=count(Comment, 'post'))
+    Category.objects.update(post_count=count(Post, 'category'))
+    Tag.objects.update(post_count=count(Post.tags.through, 'tag'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
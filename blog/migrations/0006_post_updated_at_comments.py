@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+
+
+def touch_commented_posts(apps, schema_editor):
+    # 이제 댓글이 바뀔 때 Post.updated_at을 올리므로(Last-Modified), 기존 포스트도 가장 최근 댓글 시각까지 맞춰둠
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    latest_comment = (
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        .annotate(latest=Max('modified_at')).values('latest')
+    )
+    # 댓글이 없으면 Subquery가 NULL이라 조건에 걸리지 않음
+    Post.objects.filter(updated_at__lt=Subquery(latest_comment)).update(updated_at=Subquery(latest_comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(touch_commented_posts, migrations.RunPython.noop),
+    ]
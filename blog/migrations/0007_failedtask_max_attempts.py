@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:08
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_max_attempts(apps, schema_editor):
+    # 이미 옮겨진 작업은 max_attempts번 실패한 것이므로 attempts가 원래 값
+    FailedTask = apps.get_model('blog', 'FailedTask')
+    FailedTask.objects.update(max_attempts=F('attempts'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_updated_at_comments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='failedtask',
+            name='max_attempts',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.RunPython(fill_max_attempts, migrations.RunPython.noop),
+    ]
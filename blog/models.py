@@ -2,14 +2,37 @@ from django.db import models
 from django.contrib.auth.models import User
 from markdownx.models import MarkdownxField
 from markdownx.utils import markdown
+from django.utils.text import Truncator
+from .avatars import get_avatar_url
 import os
 
 # Create your models here.
 
+EXCERPT_WORDS = 45  # post_list의 카드에 보여줄 단어 수
 
-class Tag(models.Model):
+
+class CounterFieldsModel(models.Model):
+    # 카운터 컬럼(counter_fields)은 signals에서 F()로만 바꿈 (blog/counters.py).
+    # 불러온 instance를 다시 save()할 때 그 사이에 바뀐 카운터를 옛 값으로 덮어쓰지 않도록 UPDATE에서만 뺌.
+    # (save()는 그대로라 INSERT나, 행이 지워져서 UPDATE가 0행일 때 다시 INSERT하는 것은 Django 기본과 같음)
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in self.counter_fields]
+        return super(CounterFieldsModel, self)._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+
+class Tag(CounterFieldsModel):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=200, unique=True, allow_unicode=True)
+    # 이 태그가 붙은 포스트 수 (blog/counters.py)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('post_count',)
 
     def __str__(self):
         return self.name
@@ -18,9 +41,13 @@ class Tag(models.Model):
         return f'/blog/tag/{self.slug}/'
 
 
-class Category(models.Model):
+class Category(CounterFieldsModel):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=200, unique=True, allow_unicode=True)
+    # 사이드바의 카테고리별 포스트 수 (blog/counters.py)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('post_count',)
 
     def __str__(self):
         return self.name
@@ -32,9 +59,12 @@ class Category(models.Model):
         verbose_name_plural = "Categories"
 
 
-class Post(models.Model):
+class Post(CounterFieldsModel):
     title = models.CharField(max_length=30)
     content = MarkdownxField()
+    # content를 markdown으로 변환한 결과를 저장해두고, 화면에서는 이 값을 그대로 읽음
+    content_html = models.TextField(blank=True, editable=False)
+    content_excerpt = models.TextField(blank=True, editable=False)
     hook_text = models.CharField(max_length=100, blank=True)
 
     head_image = models.ImageField(upload_to='blog/images/%Y/%m/%d/', blank=True)
@@ -45,15 +75,24 @@ class Post(models.Model):
 
     author = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
 
-    category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.SET_NULL)
+    # category_id 단독 인덱스는 아래 (category, -id) 복합 인덱스가 대신함
+    category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.SET_NULL, db_index=False)
 
     tags = models.ManyToManyField(Tag, blank=True)
 
+    # 댓글 수 (blog/counters.py)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('comment_count',)
+
+    class Meta:
+        indexes = [
+            # 카테고리 페이지(미분류 포함): WHERE category_id = ? (IS NULL) ORDER BY id DESC
+            models.Index(fields=['category', '-id'], name='blog_post_category_id_desc'),
+        ]
+
     def get_avatar_url(self):
-        if self.author.socialaccount_set.exists():
-            return self.author.socialaccount_set.first().get_avatar_url()
-        else:
-            return f'https://doitdjango.com/avatar/id/205/85a7102a015de50d/svg/{self.author.email}/'
+        return get_avatar_url(self.author)
 
     def __str__(self):
         return f'[{self.pk}]{self.title} :: {self.author}'
@@ -67,22 +106,41 @@ class Post(models.Model):
     def get_file_exit(self):
         return self.get_file_name().split('.')[-1]
 
+    def render_content(self):
+        self.content_html = markdown(self.content)
+        self.content_excerpt = Truncator(self.content_html).words(EXCERPT_WORDS, html=True, truncate=' …')
+
+    def save(self, *args, **kwargs):
+        self.render_content()
+        super(Post, self).save(*args, **kwargs)
+
     def get_content_markdown(self):
-        return markdown(self.content)
+        if not self.content_html and self.content:
+            self.render_content()
+        return self.content_html
+
+    def get_content_excerpt(self):
+        if not self.content_excerpt and self.content:
+            self.render_content()
+        return self.content_excerpt
 
 
 class Comment(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    # post_id 단독 인덱스는 아래 (post, created_at) 복합 인덱스가 대신함
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # 포스트 상세의 댓글 목록: WHERE post_id = ? ORDER BY created_at, id
+            models.Index(fields=['post', 'created_at', 'id'], name='blog_comment_post_created'),
+        ]
+
     def get_avatar_url(self):
-        if self.author.socialaccount_set.exists():
-            return self.author.socialaccount_set.first().get_avatar_url()
-        else:
-            return f'https://doitdjango.com/avatar/id/205/85a7102a015de50d/svg/{self.author.email}/'
+        return get_avatar_url(self.author)
 
     def __str__(self):
         return f'{self.author}::{self.content}'
@@ -91,3 +149,42 @@ class Comment(models.Model):
         return f'{self.post.get_absolute_url()}#comment-{self.pk}'
 
 
+
+
+class Task(models.Model):
+    # 요청 밖에서 처리할 작업 (blog/tasks.py, manage.py run_tasks)
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    # 같은 작업(name + args)이 아직 대기 중이면 새로 넣지 않고 합치기 위한 키
+    key = models.CharField(max_length=32, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # worker가 실행할 작업을 고르는 순서
+            models.Index(fields=['run_after', 'id'], name='blog_task_run_after'),
+        ]
+
+    def __str__(self):
+        return f'[{self.pk}]{self.name}{tuple(self.args)}'
+
+
+class FailedTask(models.Model):
+    # max_attempts번 실패한 작업 (dead letter). run_tasks --requeue-failed로 다시 넣을 수 있음
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    attempts = models.PositiveIntegerField()
+    # 다시 넣을 때 원래 작업의 값을 그대로 씀
+    max_attempts = models.PositiveIntegerField(default=5)
+    error = models.TextField()
+    created_at = models.DateTimeField()
+    failed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'[{self.pk}]{self.name}{tuple(self.args)}'
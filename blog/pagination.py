@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+# pk 기준 keyset(cursor) 페이지네이션.
+# ?page=N (OFFSET + COUNT(*)) 대신 ?after=<pk> / ?before=<pk>로 "pk < cursor" 조건을 인덱스로 바로 찾아감
+# BLOG_CURSOR_PAGINATION = True면 항상, 아니면 ?after, ?before가 있을 때만 사용
+
+
+def use_cursor_pagination(request):
+    return getattr(settings, 'BLOG_CURSOR_PAGINATION', False) or 'after' in request.GET or 'before' in request.GET
+
+
+def _parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CursorPage:
+    # 템플릿에서 Django Page처럼 쓸 수 있게 has_next, has_previous 등을 맞춰둠
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def cursor_paginate(queryset, params, per_page):
+    after = _parse_cursor(params.get('after'))
+    before = _parse_cursor(params.get('before'))
+
+    if before is not None:
+        # Newer: cursor보다 큰 pk를 오름차순으로 per_page + 1개 가져와서 뒤집음
+        rows = list(queryset.filter(pk__gt=before).order_by('pk')[:per_page + 1])
+        has_newer = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return CursorPage(
+            rows,
+            next_cursor=rows[-1].pk if rows else before + 1,
+            previous_cursor=rows[0].pk if has_newer else None,
+        )
+
+    queryset = queryset.order_by('-pk')
+    if after is not None:
+        queryset = queryset.filter(pk__lt=after)
+    # 한 개 더 가져와서 다음 페이지가 있는지 COUNT 없이 확인
+    rows = list(queryset[:per_page + 1])
+    has_older = len(rows) > per_page
+    rows = rows[:per_page]
+    return CursorPage(
+        rows,
+        next_cursor=rows[-1].pk if has_older else None,
+        previous_cursor=rows[0].pk if after is not None and rows else None,
+    )
+
+
+class CursorPaginationMixin:
+    cursor_pagination = True
+
+    def paginate_queryset(self, queryset, page_size):
+        if not (self.cursor_pagination and use_cursor_pagination(self.request)):
+            return super(CursorPaginationMixin, self).paginate_queryset(queryset, page_size)
+        page = cursor_paginate(queryset, self.request.GET, page_size)
+        return None, page, page.object_list, page.has_other_pages()
+
+
+def paginate_post_list(request, post_list, per_page):
+    # function view(category_page, tag_page)용: template에 넘길 post_list, page_obj, is_paginated
+    if not use_cursor_pagination(request):
+        return {'post_list': post_list}
+    page = cursor_paginate(post_list, request.GET, per_page)
+    return {'post_list': page.object_list, 'page_obj': page, 'is_paginated': page.has_other_pages()}
+
+
+# 포스트 상세의 댓글: (created_at, pk) keyset.
+# 최근 댓글 BLOG_COMMENTS_PER_PAGE개를 보여주고, "이전 댓글"을 누르면 그보다 오래된 댓글을 같은 수만큼 불러옴
+# (views.comment_list). 새 댓글은 항상 첫 화면에 보임
+COMMENT_CURSOR_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def comment_cursor(comment):
+    return f'{comment.created_at.strftime(COMMENT_CURSOR_FORMAT)}-{comment.pk}'
+
+
+def parse_comment_cursor(value):
+    try:
+        created_at, pk = value.split('-')
+        return datetime.strptime(created_at, COMMENT_CURSOR_FORMAT), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def paginate_comments(queryset, before, per_page):
+    # before(cursor)보다 오래된 댓글 per_page개를 오래된 순서로. next_cursor는 더 오래된 댓글이 있을 때만
+    cursor = parse_comment_cursor(before)
+    if cursor is not None:
+        created_at, pk = cursor
+        # (created_at, id) < (?, ?). created_at__lte는 인덱스(post, created_at, id)의 범위 조건
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk), created_at__lte=created_at
+        )
+    rows = list(queryset.order_by('-created_at', '-pk')[:per_page + 1])
+    has_older = len(rows) > per_page
+    rows = rows[:per_page][::-1]
+    return CursorPage(rows, next_cursor=comment_cursor(rows[0]) if has_older else None)
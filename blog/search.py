@@ -0,0 +1,187 @@
+from django.conf import settings
+from django.db import connection, DatabaseError
+from django.db.models import Q
+
+# 포스트 검색용 인덱스.
+# sqlite: FTS5 가상 테이블(trigram tokenizer -> 기존 contains 검색처럼 단어 중간도 찾음)
+# postgresql: tsvector 컬럼 + GIN 인덱스
+# 둘 다 blog_post와 별도의 테이블이라 migration 대신 post_migrate에서 만들고, signals에서 갱신함
+
+SEARCH_MAX_RESULTS = getattr(settings, 'BLOG_SEARCH_MAX_RESULTS', 1000)
+
+
+class SqliteSearchBackend:
+    table = 'blog_post_fts'
+    min_query_length = 3  # trigram tokenizer는 3글자 미만은 찾지 못함
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+            f"USING fts5(title, hook_text, content, tags, tokenize='trigram')"
+        )
+
+    def index_rows(self, cursor, rows):
+        # rows: [(pk, title, hook_text, content, tags), ...]
+        cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [[row[0]] for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {self.table} (rowid, title, hook_text, content, tags) VALUES (%s, %s, %s, %s, %s)',
+            rows
+        )
+
+    def remove_post(self, cursor, pk):
+        cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, cursor, q, limit):
+        if len(q) < self.min_query_length:
+            return None
+        phrase = '"' + q.replace('"', '""') + '"'
+        # bm25 가중치: title > hook_text = tags > content
+        cursor.execute(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+            f'ORDER BY bm25({self.table}, 10.0, 5.0, 1.0, 5.0) LIMIT %s',
+            [phrase, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    table = 'blog_post_search'
+    document_sql = (
+        "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C') || setweight(to_tsvector('simple', %s), 'B')"
+    )
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            f'post_id integer PRIMARY KEY REFERENCES blog_post (id) ON DELETE CASCADE, '
+            f'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_document_idx ON {self.table} USING GIN (document)')
+
+    def index_rows(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {self.table} (post_id, document) VALUES (%s, {self.document_sql}) '
+            f'ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document',
+            rows
+        )
+
+    def remove_post(self, cursor, pk):
+        cursor.execute(f'DELETE FROM {self.table} WHERE post_id = %s', [pk])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, cursor, q, limit):
+        # 단어마다 prefix 검색 ('파이썬' -> '파이썬에'도 찾음)
+        terms = [t.replace("'", "''").replace('\\', '') for t in q.split()]
+        terms = [t for t in terms if t]
+        if not terms:
+            return None
+        tsquery = ' & '.join(f"'{t}':*" for t in terms)
+        cursor.execute(
+            f'SELECT post_id FROM {self.table}, to_tsquery(%s, %s) query '
+            f'WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s',
+            ['simple', tsquery, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+_available = {}
+
+
+def get_backend():
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return None
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _available:
+        _available[key] = backend.table in connection.introspection.table_names()
+    return backend if _available[key] else None
+
+
+def create_search_index(**kwargs):
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return
+    is_new = backend.table not in connection.introspection.table_names()
+    try:
+        with connection.cursor() as cursor:
+            backend.create_index(cursor)
+    except DatabaseError:
+        # 오래된 sqlite처럼 FTS5 trigram을 지원하지 않으면 기존 contains 검색을 그대로 씀
+        return
+    _available.clear()
+    if is_new:
+        reindex_all()
+
+
+def index_post(post):
+    index_posts([(post, [t.name for t in post.tags.all()])])
+
+
+def index_posts(posts_with_tag_names):
+    # [(post, [tag name, ...]), ...]을 한번에 인덱싱 (seed_blog처럼 대량으로 넣을 때)
+    backend = get_backend()
+    if backend is None:
+        return
+    rows = [
+        [post.pk, post.title, post.hook_text, post.content, ' '.join(tag_names)]
+        for post, tag_names in posts_with_tag_names
+    ]
+    if rows:
+        with connection.cursor() as cursor:
+            backend.index_rows(cursor, rows)
+
+
+def remove_post(pk):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.remove_post(cursor, pk)
+
+
+def reindex_all(batch_size=500, clear=False):
+    # pk 순서로 batch_size개씩 (포스트 + 태그 쿼리 2번) 읽어서 인덱싱
+    from .models import Post
+
+    backend = get_backend()
+    if backend is not None and clear:
+        with connection.cursor() as cursor:
+            backend.clear(cursor)
+
+    count = 0
+    last_pk = 0
+    while True:
+        posts = list(Post.objects.filter(pk__gt=last_pk).order_by('pk').prefetch_related('tags')[:batch_size])
+        if not posts:
+            return count
+        index_posts([(post, [t.name for t in post.tags.all()]) for post in posts])
+        count += len(posts)
+        last_pk = posts[-1].pk
+
+
+def search_post_ids(q, limit=SEARCH_MAX_RESULTS):
+    # 관련도 순으로 정렬된 포스트 pk 목록. 쿼리는 한번만 실행됨
+    backend = get_backend()
+    if backend is not None:
+        with connection.cursor() as cursor:
+            ids = backend.search(cursor, q, limit)
+        if ids is not None:
+            return ids
+
+    from .models import Post
+    return list(
+        Post.objects.filter(
+            Q(title__contains=q) | Q(tags__name__contains=q)
+        ).distinct().order_by('-pk').values_list('pk', flat=True)[:limit]
+    )
@@ -0,0 +1,241 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.contrib.auth.models import User
+from allauth.socialaccount.models import SocialAccount
+from .models import Post, Category, Tag, Comment
+from .cache import (
+    bump_version, post_pages_version_key, SIDEBAR_VERSION_KEY, LIST_PAGES_VERSION_KEY, FRAGMENTS_VERSION_KEY,
+)
+from .avatars import invalidate_avatar_url
+from django.conf import settings
+from . import counters, search, tasks, thumbnails
+
+
+@receiver(post_init, sender=Post)
+def remember_loaded_values(sender, instance, **kwargs):
+    # 저장할 때 카테고리/head_image가 바뀌었는지 알기 위해 불러올 때의 값을 기억해둠
+    # (only()로 category를 빼고 불러온 경우 추가 쿼리가 나가지 않도록 __dict__에서 읽음)
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+    head_image = instance.__dict__.get('head_image')
+    instance._loaded_head_image = getattr(head_image, 'name', head_image)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, created, **kwargs):
+    bump_version(LIST_PAGES_VERSION_KEY)
+    bump_version(post_pages_version_key(instance.pk))
+    # 카테고리별 포스트 수가 바뀔 때만 사이드바를 무효화
+    category_id = instance.__dict__.get('category_id')
+    if created or category_id != instance._loaded_category_id:
+        counters.adjust(Category, 'post_count', [category_id], 1)
+        if not created:
+            counters.adjust(Category, 'post_count', [instance._loaded_category_id], -1)
+        bump_version(SIDEBAR_VERSION_KEY)
+    instance._loaded_category_id = category_id
+
+
+@receiver(post_save, sender=Post)
+def build_head_image_derivatives(sender, instance, **kwargs):
+    # 새로 올라온 head_image의 크기별 파일을 worker에서 만들어 둠
+    # (그 전에 요청이 오면 템플릿 태그가 만들거나 원본을 보여줌)
+    name = instance.head_image.name
+    if name and name != instance._loaded_head_image:
+        tasks.build_derivatives.delay(name)
+    instance._loaded_head_image = name
+
+
+def delete_unused_derivatives(name, post_pk):
+    # 다른 포스트가 같은 파일을 쓰고 있으면(synthetic 데이터의 placeholder 등) 남겨둠
+    if name and not Post.objects.filter(head_image=name).exclude(pk=post_pk).exists():
+        thumbnails.delete_derivatives(name)
+
+
+@receiver(pre_save, sender=Post)
+def delete_replaced_head_image_derivatives(sender, instance, **kwargs):
+    # head_image가 바뀌거나 지워지면 이전 이미지의 크기별 파일은 더 이상 쓰이지 않음
+    if instance.pk is None or 'head_image' not in instance.__dict__:
+        return
+    if instance.head_image.name != instance._loaded_head_image:
+        delete_unused_derivatives(instance._loaded_head_image, instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def delete_deleted_post_derivatives(sender, instance, **kwargs):
+    head_image = instance.__dict__.get('head_image')
+    delete_unused_derivatives(getattr(head_image, 'name', head_image), instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    bump_version(LIST_PAGES_VERSION_KEY)
+    bump_version(post_pages_version_key(instance.pk))
+    bump_version(SIDEBAR_VERSION_KEY)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    # 포스트가 지워질 때 태그 연결은 m2m_changed 없이 같이 지워지므로 미리 기억해둠
+    instance._deleted_tag_pks = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.adjust(Category, 'post_count', [instance.category_id], -1)
+    counters.adjust(Tag, 'post_count', instance.__dict__.pop('_deleted_tag_pks', []), -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, **kwargs):
+    # 상세 페이지는 사이드바 버전을 같이 보므로 같이 무효화됨
+    bump_version(SIDEBAR_VERSION_KEY)
+    bump_version(LIST_PAGES_VERSION_KEY)
+    # 카드에 카테고리 이름이 들어감
+    bump_version(FRAGMENTS_VERSION_KEY)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    bump_version(post_pages_version_key(instance.post_id))
+    # 목록/카테고리/태그/첫 페이지의 카드에 댓글 수가 나옴
+    bump_version(LIST_PAGES_VERSION_KEY)
+    # 상세 페이지의 Last-Modified(updated_at)가 댓글을 지울 때도 뒤로 가지 않고 앞으로 가도록
+    touch_posts([instance.post_id])
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust(Post, 'comment_count', [instance.post_id], 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.adjust(Post, 'comment_count', [instance.post_id], -1)
+
+
+def invalidate_tagged_post_pages(post_pks):
+    bump_version(LIST_PAGES_VERSION_KEY)
+    for pk in post_pks:
+        bump_version(post_pages_version_key(pk))
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_tag_pages(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_tagged_post_pages(instance.post_set.values_list('pk', flat=True))
+        bump_version(FRAGMENTS_VERSION_KEY)
+
+
+@receiver(pre_delete, sender=Tag)
+def invalidate_deleted_tag_pages(sender, instance, **kwargs):
+    invalidate_tagged_post_pages(instance.post_set.values_list('pk', flat=True))
+    bump_version(FRAGMENTS_VERSION_KEY)
+
+
+def touch_posts(post_pks):
+    # 태그를 붙이고 떼거나 댓글이 바뀌는 것은 Post.save()를 거치지 않으므로 updated_at을 직접 올려서
+    # 그 포스트들의 조각 캐시 키와 Last-Modified를 바꿈
+    now = timezone.now()
+    Post.objects.filter(pk__in=post_pks).update(updated_at=now)
+    return now
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def warm_post_pages(sender, instance, signal, **kwargs):
+    # 무효화된 익명 페이지를 worker가 미리 다시 만들어 둠
+    if settings.BLOG_WARM_PAGE_CACHE:
+        paths = ['/', '/blog/']
+        if signal is post_save:
+            paths.append(instance.get_absolute_url())
+        tasks.warm_pages.delay(paths)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def warm_comment_pages(sender, instance, **kwargs):
+    if settings.BLOG_WARM_PAGE_CACHE:
+        tasks.warm_pages.delay([f'/blog/{instance.post_id}/'])
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    tasks.index_posts.delay([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    # 한 행 지우는 것이라 바로 처리
+    search.remove_post(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # post.tags.add(...) 등: 포스트 하나만 다시 인덱싱
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            tasks.index_posts.delay([instance.pk])
+            invalidate_tagged_post_pages([instance.pk])
+            instance.updated_at = touch_posts([instance.pk])
+        return
+
+    # tag.post_set.add(...) 등: 태그가 붙거나 떨어진 포스트들을 다시 인덱싱
+    if action == 'pre_clear':
+        instance._cleared_post_pks = list(instance.post_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_post_pks', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if pk_set:
+        tasks.index_posts.delay(sorted(pk_set))
+        touch_posts(pk_set)
+    invalidate_tagged_post_pages(pk_set)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    # remove()의 pk_set에는 연결되어 있지 않던 pk도 들어오므로 pre_remove/pre_clear에서 실제 연결을 확인해둠
+    # (add()의 pk_set은 새로 연결된 것만 들어옴)
+    own, other = ('tag_id', 'post_id') if reverse else ('post_id', 'tag_id')
+    if action in ('pre_remove', 'pre_clear'):
+        links = sender.objects.filter(**{own: instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{f'{other}__in': pk_set})
+        instance._unlinked_pks = list(links.values_list(other, flat=True))
+        return
+    if action == 'post_add':
+        linked, delta = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        linked, delta = instance.__dict__.pop('_unlinked_pks', []), -1
+    else:
+        return
+    if reverse:
+        # tag.post_set.add(...): 이 태그의 수만 바뀜
+        counters.adjust(Tag, 'post_count', [instance.pk], delta * len(linked))
+    else:
+        counters.adjust(Tag, 'post_count', linked, delta)
+
+
+@receiver(post_save, sender=Tag)
+def update_search_index_tag_name(sender, instance, created, **kwargs):
+    if not created:
+        post_pks = list(instance.post_set.order_by('pk').values_list('pk', flat=True))
+        if post_pks:
+            tasks.index_posts.delay(post_pks)
+
+
+@receiver(post_save, sender=SocialAccount)
+@receiver(post_delete, sender=SocialAccount)
+def invalidate_social_avatar(sender, instance, **kwargs):
+    invalidate_avatar_url(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_avatar(sender, instance, created, **kwargs):
+    # 소셜 계정이 없으면 email로 아바타를 만듦
+    if not created:
+        invalidate_avatar_url(instance.pk)
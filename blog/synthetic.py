@@ -0,0 +1,169 @@
+import io
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils.text import slugify
+
+from .models import Post, Category, Tag, Comment
+from .cache import invalidate_all
+from . import counters, search
+
+# 벤치마크/부하 테스트용 가짜 데이터 생성.
+# 포스트를 batch_size개씩 만들고, 그 포스트의 태그 연결/댓글까지 같은 transaction에서 bulk_create한 뒤 버림
+# -> 포스트가 10만개, 댓글이 수백만개여도 메모리에는 한 batch만 올라감.
+# 같은 random_seed면 (빈 DB 기준) 같은 데이터가 만들어짐
+
+WORDS = (
+    'django python blog post 장고 파이썬 공부 웹 개발 서버 database query index cache template '
+    'view model form test 성능 최적화 배포 markdown tag category comment user 포스트 댓글 카테고리'
+).split()
+
+PLACEHOLDER_IMAGE_DIR = 'blog/images/synthetic'
+
+
+def sentence(rng, n_words):
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def markdown_body(rng, paragraphs=4):
+    lines = [f'# {sentence(rng, 4)}', '']
+    for i in range(paragraphs):
+        if i % 2:
+            lines.append(f'## {sentence(rng, 3)}')
+            lines.append('')
+        lines.append(sentence(rng, rng.randint(30, 80)))
+        lines.append('')
+        if i == 1:
+            lines.extend([f'- {sentence(rng, 5)}' for _ in range(3)] + [''])
+    return '\n'.join(lines)
+
+
+def bulk_insert(model, objs, batch_size):
+    # bulk_create는 iterable을 통째로 list로 만들기 때문에 batch_size씩 잘라서 넣음
+    objs = iter(objs)
+    count = 0
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return count
+        model.objects.bulk_create(batch)
+        count += len(batch)
+
+
+def make_placeholder_images(count, rng):
+    # 단색 jpeg 몇 장을 MEDIA_ROOT에 만들어두고 포스트들이 나눠 씀
+    from PIL import Image
+
+    names = []
+    for i in range(count):
+        name = f'{PLACEHOLDER_IMAGE_DIR}/placeholder_{i}.jpg'
+        if not default_storage.exists(name):
+            color = tuple(rng.randrange(256) for _ in range(3))
+            buffer = io.BytesIO()
+            Image.new('RGB', (1200, 400), color).save(buffer, 'JPEG', quality=80)
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+        names.append(name)
+    return names
+
+
+def get_or_create_named(model, field, names, make, batch_size):
+    # field(username, slug) 값이 이미 있으면 그대로 쓰고, 없는 것만 만듦. {name: pk} (names 순서대로)
+    existing = dict(model.objects.filter(**{f'{field}__in': names}).values_list(field, 'pk'))
+    missing = [name for name in names if name not in existing]
+    if missing:
+        model.objects.bulk_create([make(name) for name in missing], batch_size=batch_size, ignore_conflicts=True)
+        existing = dict(model.objects.filter(**{f'{field}__in': names}).values_list(field, 'pk'))
+    return {name: existing[name] for name in names if name in existing}
+
+
+def seed(users=5, categories=5, tags=20, posts=200, comments_per_post=3, tags_per_post=3, random_seed=0,
+         batch_size=1000, head_images=0, index=True, progress=None):
+    rng = random.Random(random_seed)
+    password = make_password('benchmark')  # 해싱은 한번만
+
+    user_names = [f'bench_user_{i}' for i in range(users)]
+    user_ids = list(get_or_create_named(
+        User, 'username', user_names,
+        lambda name: User(username=name, email=f'{name}@example.com', password=password,
+                          is_staff=(name == 'bench_user_0')),
+        batch_size,
+    ).values())
+
+    category_ids = list(get_or_create_named(
+        Category, 'slug', [f'bench-category-{i}' for i in range(categories)],
+        lambda slug: Category(name=slug, slug=slug), batch_size,
+    ).values())
+
+    tag_pks = get_or_create_named(
+        Tag, 'slug', [slugify(f'bench-tag-{i}') for i in range(tags)],
+        lambda slug: Tag(name=slug, slug=slug), batch_size,
+    )
+    tag_ids = list(tag_pks.values())
+    tag_names = {pk: slug for slug, pk in tag_pks.items()}
+
+    images = make_placeholder_images(head_images, rng) if head_images else []
+
+    through = Post.tags.through
+    post_ids = []
+    created = {'posts': 0, 'comments': 0, 'tag_links': 0}
+    remaining = posts
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        with transaction.atomic():
+            # sqlite에서는 bulk_create가 pk를 돌려주지 않으므로, 넣기 전의 최대 pk 다음부터를 이번 batch로 봄
+            last_pk = Post.objects.aggregate(Max('pk'))['pk__max'] or 0
+            batch = []
+            for _ in range(n):
+                post = Post(
+                    title=sentence(rng, 3)[:30],
+                    hook_text=sentence(rng, 6)[:100],
+                    content=markdown_body(rng),
+                    author_id=rng.choice(user_ids),
+                    # 10%는 미분류
+                    category_id=rng.choice(category_ids) if category_ids and rng.random() > 0.1 else None,
+                    head_image=rng.choice(images) if images else '',
+                )
+                post.render_content()  # bulk_create는 save()를 부르지 않음
+                batch.append(post)
+            Post.objects.bulk_create(batch)
+            batch_ids = list(Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True))
+            for post, pk in zip(batch, batch_ids):
+                post.pk = post.id = pk
+
+            post_tags = {pk: rng.sample(tag_ids, min(tags_per_post, len(tag_ids))) for pk in batch_ids}
+            created['tag_links'] += bulk_insert(through, (
+                through(post_id=pk, tag_id=tag_id) for pk, tag_id_list in post_tags.items() for tag_id in tag_id_list
+            ), batch_size)
+
+            # 댓글 수는 평균이 comments_per_post가 되도록 포스트마다 다르게
+            created['comments'] += bulk_insert(Comment, (
+                Comment(post_id=pk, author_id=rng.choice(user_ids), content=sentence(rng, rng.randint(5, 30)))
+                for pk in batch_ids
+                for _ in range(rng.randint(0, 2 * comments_per_post))
+            ), batch_size)
+
+            if index:
+                search.index_posts([(post, [tag_names[t] for t in post_tags[post.pk]]) for post in batch])
+
+        post_ids.extend(batch_ids)
+        created['posts'] += len(batch_ids)
+        remaining -= n
+        if progress:
+            progress(created)
+
+    # bulk_create는 signal을 보내지 않으므로 카운터를 한번에 다시 셈
+    counters.reconcile()
+    invalidate_all()
+    return {
+        'users': user_ids,
+        'categories': category_ids,
+        'tags': tag_ids,
+        'posts': post_ids,
+        'created': created,
+    }
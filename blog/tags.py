@@ -0,0 +1,79 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from .models import Tag
+
+
+def parse_tags_str(tags_str):
+    # 'a; b, c;' -> ['a', 'b', 'c'] (빈 조각과 중복은 버림)
+    names = []
+    for name in (tags_str or '').replace(',', ';').split(';'):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def base_slug(name):
+    # 'C++', 'C#'처럼 slug가 같아지거나 '!!!'처럼 비는 이름이 있으므로 unique_slugs로 뒤에 번호를 붙임
+    return slugify(name, allow_unicode=True) or 'tag'
+
+
+def unique_slugs(names):
+    # 새 태그 이름마다 기존 태그, 같이 만드는 태그와 겹치지 않는 slug (쿼리 1번)
+    bases = {name: base_slug(name) for name in names}
+    prefixes = Q()
+    for base in set(bases.values()):
+        prefixes |= Q(slug=base) | Q(slug__startswith=f'{base}-')
+    taken = set(Tag.objects.filter(prefixes).values_list('slug', flat=True))
+    slugs = {}
+    for name, base in bases.items():
+        slug, n = base, 1
+        while slug in taken:
+            n += 1
+            slug = f'{base}-{n}'
+        taken.add(slug)
+        slugs[name] = slug
+    return slugs
+
+
+def create_tag(name):
+    # bulk_create에서 빠진 태그 하나를 만듦. 그 사이에 다른 요청이 같은 이름을 만들었으면 그것을,
+    # 같은 slug를 가져갔으면 다음 번호로
+    for attempt in range(5):
+        try:
+            with transaction.atomic():
+                return Tag.objects.create(name=name, slug=unique_slugs([name])[name])
+        except IntegrityError:
+            tag = Tag.objects.filter(name=name).first()
+            if tag is not None:
+                return tag
+            if attempt == 4:
+                raise
+
+
+def sync_post_tags(post, tags_str):
+    # tags_str대로 post의 태그를 맞춤. 이미 있는 태그는 IN 쿼리 한번으로 가져오고,
+    # 없는 태그는 bulk_create, M2M은 바뀐 것만 add/remove
+    names = parse_tags_str(tags_str)
+
+    with transaction.atomic():
+        tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+        new_names = [name for name in names if name not in tags]
+        if new_names:
+            slugs = unique_slugs(new_names)
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=slugs[name]) for name in new_names],
+                ignore_conflicts=True,  # 동시에 같은 태그(이름이나 slug)가 만들어진 경우
+            )
+            tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=new_names)})
+            for name in new_names:
+                if name not in tags:
+                    tags[name] = create_tag(name)
+
+        wanted = {tags[name].pk for name in names if name in tags}
+        current = set(post.tags.values_list('pk', flat=True))
+        if current - wanted:
+            post.tags.remove(*(current - wanted))
+        if wanted - current:
+            post.tags.add(*(wanted - current))
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from .cache import LIST_PAGES_VERSION_KEY, bump_version
+from .models import Post, Task, FailedTask
+from . import search, thumbnails
+
+# DB 테이블(Task)을 큐로 쓰는 간단한 작업 큐.
+# 포스트 저장 후에 해야 하지만 응답을 기다리게 할 필요는 없는 일(검색 인덱스, 이미지 derivative, 캐시 예열)을
+# 요청 안에서는 Task 행으로만 넣고, manage.py run_tasks worker가 꺼내서 실행함.
+# Task 행은 transaction.on_commit으로 요청의 DB 변경이 commit된 뒤에 넣음
+# (ATOMIC_REQUESTS가 없으므로 그냥 넣으면 autocommit되어 worker가 포스트 저장이 끝나기 전에 실행할 수 있음).
+# BLOG_TASKS_EAGER가 켜져 있으면(개발, 테스트) 큐에 넣지 않고 바로 실행함
+
+RETRY_BASE_SECONDS = getattr(settings, 'BLOG_TASKS_RETRY_BASE_SECONDS', 10)
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, 'BLOG_TASKS_LOCK_TIMEOUT', 300))
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__name__}'
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def delay(self, *args, countdown=0):
+        return enqueue(self.name, list(args), countdown=countdown, max_attempts=self.max_attempts)
+
+
+def task(max_attempts=5):
+    def decorator(func):
+        task_function = TaskFunction(func, max_attempts)
+        registry[task_function.name] = task_function
+        return task_function
+    return decorator
+
+
+def task_key(name, args):
+    return hashlib.md5(json.dumps([name, args], sort_keys=True).encode()).hexdigest()
+
+
+def enqueue(name, args, countdown=0, max_attempts=5):
+    if getattr(settings, 'BLOG_TASKS_EAGER', False):
+        registry[name](*args)
+        return
+    # transaction 밖이면 바로 실행됨
+    transaction.on_commit(lambda: insert_task(name, args, countdown, max_attempts))
+
+
+def insert_task(name, args, countdown, max_attempts):
+    key = task_key(name, args)
+    # 같은 요청에서 포스트 저장 + 태그 변경처럼 같은 작업이 여러번 들어오면 하나만 남김.
+    # 실패해서 다시 시도를 기다리는 작업(attempts > 0)에는 합치지 않음 (run_after까지 늦춰지므로)
+    if Task.objects.filter(key=key, locked_at=None, attempts=0).exists():
+        return None
+    return Task.objects.create(
+        name=name, args=args, key=key, max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_tasks(worker_id, limit=10):
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(run_after__lte=now)
+        # locked_at이 오래된 작업은 worker가 죽은 것으로 보고 다시 가져감
+        .exclude(locked_at__gt=now - LOCK_TIMEOUT)
+        .order_by('run_after', 'pk')
+        .values_list('pk', 'locked_at')[:limit]
+    )
+    claimed = []
+    for pk, locked_at in candidates:
+        # 다른 worker가 먼저 가져갔으면 0행이 바뀜
+        if Task.objects.filter(pk=pk, locked_at=locked_at).update(locked_at=now, locked_by=worker_id):
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed, locked_by=worker_id).order_by('run_after', 'pk'))
+
+
+def run_task(task_row):
+    # 성공하면 지우고, 실패하면 지수적으로 늦춰서 다시 시도하고, max_attempts번 실패하면 FailedTask로 옮김
+    try:
+        task_function = registry[task_row.name]
+        task_function(*task_row.args)
+    except Exception:
+        error = traceback.format_exc()
+        attempts = task_row.attempts + 1
+        with transaction.atomic():
+            if attempts >= task_row.max_attempts:
+                FailedTask.objects.create(
+                    name=task_row.name, args=task_row.args, attempts=attempts,
+                    max_attempts=task_row.max_attempts, error=error, created_at=task_row.created_at,
+                )
+                task_row.delete()
+            else:
+                Task.objects.filter(pk=task_row.pk).update(
+                    attempts=attempts, last_error=error, locked_at=None, locked_by='',
+                    run_after=timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1)),
+                )
+        return False
+    task_row.delete()
+    return True
+
+
+def run_pending(worker_id=None, limit=10):
+    # 지금 실행할 수 있는 작업을 limit개까지 실행. (성공 수, 실패 수)
+    worker_id = worker_id or default_worker_id()
+    succeeded = failed = 0
+    for task_row in claim_tasks(worker_id, limit):
+        if run_task(task_row):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def requeue_failed():
+    count = 0
+    for failed in FailedTask.objects.order_by('pk'):
+        with transaction.atomic():
+            Task.objects.create(
+                name=failed.name, args=failed.args, key=task_key(failed.name, failed.args),
+                max_attempts=failed.max_attempts, run_after=timezone.now(),
+            )
+            failed.delete()
+        count += 1
+    return count
+
+
+# 작업들
+
+@task()
+def index_posts(post_pks):
+    posts = list(Post.objects.filter(pk__in=post_pks).prefetch_related('tags'))
+    search.index_posts([(post, [t.name for t in post.tags.all()]) for post in posts])
+    # 큐에서 기다리는 동안 지워진 포스트
+    for pk in set(post_pks) - {post.pk for post in posts}:
+        search.remove_post(pk)
+    # 저장할 때 올린 목록 버전으로 캐시된 검색 결과는 예전 인덱스로 만든 것이므로 다시 올림
+    bump_version(LIST_PAGES_VERSION_KEY)
+
+
+@task()
+def build_derivatives(name):
+    thumbnails.generate_derivatives(name)
+
+
+@task(max_attempts=2)
+def warm_pages(paths):
+    # 익명 사용자로 페이지를 한번 렌더링해서 anonymous_page_cache를 채워둠
+    # (django.test는 무거우므로 웹 worker가 시작할 때 import하지 않도록 여기서)
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    for path in paths:
+        try:
+            match = resolve(path)
+        except Resolver404:
+            continue
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        request.resolver_match = match
+        view = async_to_sync(match.func) if asyncio.iscoroutinefunction(match.func) else match.func
+        response = view(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
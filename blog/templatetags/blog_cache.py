@@ -0,0 +1,58 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from do_it_django_prj import perf
+from ..cache import FRAGMENTS_VERSION_KEY, FRAGMENT_CACHE_TIMEOUT, fragment_cache_key, get_version
+
+register = template.Library()
+
+
+class PostFragmentNode(template.Node):
+    def __init__(self, nodelist, name, post, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.post = post
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not getattr(settings, 'BLOG_FRAGMENT_CACHE', True):
+            return self.nodelist.render(context)
+
+        # 전체 조각 버전은 템플릿을 한번 렌더링하는 동안 한번만 읽음 (목록 페이지의 카드 여러 개)
+        if FRAGMENTS_VERSION_KEY not in context.render_context:
+            context.render_context[FRAGMENTS_VERSION_KEY] = get_version(FRAGMENTS_VERSION_KEY)
+        key = fragment_cache_key(
+            self.name.resolve(context),
+            self.post.resolve(context),
+            [value.resolve(context) for value in self.vary_on],
+            context.render_context[FRAGMENTS_VERSION_KEY],
+        )
+
+        html = cache.get(key)
+        stats = perf.current_request.get()
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(key, html, FRAGMENT_CACHE_TIMEOUT)
+            if stats is not None:
+                stats.fragment_misses += 1
+        elif stats is not None:
+            stats.fragment_hits += 1
+        return html
+
+
+@register.tag
+def post_fragment(parser, token):
+    # {% post_fragment 'card' post [vary_on ...] %} ... {% endpost_fragment %}
+    # 안쪽 HTML을 (post.pk, post.updated_at)과 vary_on 값별로 캐시함. 로그인한 사용자마다 다른 내용은 넣으면 안 됨
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name and a post.")
+    nodelist = parser.parse(('endpost_fragment',))
+    parser.delete_first_token()
+    return PostFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,36 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from ..thumbnails import FORMATS, get_derivatives
+
+register = template.Library()
+
+FALLBACK_WIDTH = 800  # srcset을 모르는 브라우저가 받을 크기
+# base.html의 본문 영역(col-md-8 col-lg-9) 폭
+MAIN_AREA_SIZES = '(min-width: 1200px) 825px, (min-width: 992px) 690px, (min-width: 768px) 450px, 100vw'
+
+
+def srcset(derivatives):
+    return format_html_join(', ', '{} {}w', ((default_storage.url(name), width) for name, width in derivatives))
+
+
+@register.simple_tag
+def responsive_image(image, sizes=MAIN_AREA_SIZES, **attrs):
+    # {% responsive_image post.head_image class="..." alt="..." %}
+    # -> <picture>에 webp source와 jpeg srcset을 넣음. derivative가 없으면 원본 <img>
+    derivatives = get_derivatives(image.name) if image else None
+    if not derivatives:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((mime, srcset(derivatives[ext]), sizes) for ext, _, mime, _ in FORMATS[:-1] if derivatives.get(ext)),
+    )
+    fallback = derivatives[FORMATS[-1][0]]
+    src = next((name for name, width in reversed(fallback) if width <= FALLBACK_WIDTH), fallback[0][0])
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, default_storage.url(src), srcset(fallback), sizes, flatatt(attrs),
+    )
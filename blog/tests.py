@@ -1,11 +1,48 @@
-from django.test import TestCase, Client
+import asyncio
+import importlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from allauth.socialaccount.models import SocialAccount
+from asgiref.sync import async_to_sync
 from bs4 import BeautifulSoup
-from django.contrib.auth.models import User
-from .models import Post, Category, Tag, Comment
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date, parse_http_date
+from PIL import Image
+
+from do_it_django_prj import db, perf, startup
+from do_it_django_prj.media import SendfileProxy
+from do_it_django_prj.middleware import DatabaseMiddleware
+from do_it_django_prj.templates import template_loaders, template_names, warm_templates
+from . import cache as cache_module
+from . import counters, search, synthetic, tasks, thumbnails
+from . import tags as tags_module
+from . import views
+from .models import Post, Category, Tag, Comment, Task, FailedTask
+from .tags import parse_tags_str, sync_post_tags
+from .views import get_post_queryset
 
 # Create your tests here.
 
-class TestView(TestCase):
+# 모든 테스트가 같이 쓰는 사용자, 카테고리, 태그, 포스트, 댓글
+class BlogTestCase(TestCase):
     def setUp(self):
         self.client = Client()
         # Class와 Class()의 차이점: variable = Class: variable을 namespace로 사용할 수 있음. 클래스 자체를 넘기는거,, variable = Class(): instance를 생성하는 것
@@ -62,6 +99,8 @@ class TestView(TestCase):
 
         self.posts = [self.post_001, self.post_002]
 
+
+class TestView(BlogTestCase):
     def category_card_test(self, soup):
         categories_card = soup.find('div', id='categories-card')
         self.assertIn('Categories', categories_card.text)
@@ -470,7 +509,910 @@ class TestView(TestCase):
         self.assertIn(self.post_uncategorized.title, main_area.text)
         self.assertIn(post_about_python.title, main_area.text)
 
+    def test_post_content_html(self):
+        post = Post.objects.create(
+            title='마크다운 포스트',
+            content='# 제목\n\n' + ' '.join(['word'] * 100),
+            author=self.user_trump,
+        )
+        self.assertIn('<h1>제목</h1>', post.content_html)
+        self.assertTrue(post.content_excerpt.endswith('…</p>'))
+
+        # 저장된 html이 없는 포스트는 render_post_content 커맨드로 채움
+        Post.objects.filter(pk=post.pk).update(content_html='', content_excerpt='')
+        call_command('render_post_content', '--only-missing', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIn('<h1>제목</h1>', post.content_html)
+
+        response = self.client.get('/blog/')
+        main_area = BeautifulSoup(response.content, 'html.parser').find('div', id='main-area')
+        self.assertIn('제목', main_area.find('div', id=f'post-{post.pk}').text)
+
+        # 바뀐 포스트가 있으면 캐시된 목록/상세 페이지도 새 html로 바뀜 (signal 없이 bulk_update)
+        self.client.get(f'/blog/{post.pk}/')
+        Post.objects.filter(pk=post.pk).update(content='# 새 제목')
+        out = StringIO()
+        call_command('render_post_content', stdout=out)
+        self.assertIn('1 posts rendered', out.getvalue())  # 그대로인 포스트는 다시 저장하지 않음
+        response = self.client.get('/blog/')
+        self.assertIn('새 제목', BeautifulSoup(response.content, 'html.parser').find('div', id=f'post-{post.pk}').text)
+        response = self.client.get(f'/blog/{post.pk}/')
+        self.assertIn('<h1>새 제목</h1>', response.content.decode())
+
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_avatar_urls(self):
+        SocialAccount.objects.create(
+            user=self.user_trump, provider='google', uid='trump',
+            extra_data={'picture': 'https://example.com/trump.png'},
+        )
+        for i in range(5):
+            Comment.objects.create(post=self.post_001, author=self.user_trump, content=f'트럼프의 댓글 {i}')
+
+        # 댓글 수와 상관없이 아바타는 SocialAccount 쿼리 한번으로 resolve
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.post_001.get_absolute_url())
+        self.assertEqual(
+            len([q for q in queries.captured_queries if 'socialaccount_socialaccount' in q['sql']]), 1
+        )
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(
+            soup.find('div', id='comment-2').find('img').attrs['src'], 'https://example.com/trump.png'
+        )
+
+        # 두번째부터는 캐시에서 읽음
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.post_001.get_absolute_url())
+        self.assertFalse([q for q in queries.captured_queries if 'socialaccount_socialaccount' in q['sql']])
+
+        # 소셜 계정이 바뀌면 캐시도 갱신됨
+        account = SocialAccount.objects.get(user=self.user_trump)
+        account.extra_data = {'picture': 'https://example.com/trump2.png'}
+        account.save()
+        response = self.client.get(self.post_001.get_absolute_url())
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(
+            soup.find('div', id='comment-2').find('img').attrs['src'], 'https://example.com/trump2.png'
+        )
+
+    def test_sync_post_tags(self):
+        self.assertEqual(parse_tags_str(' python; 새 태그, python;; '), ['python', '새 태그'])
+
+        # 태그 수와 상관없이 쿼리 수가 일정함
+        post_many_tags = Post.objects.create(title='태그가 많은 포스트', content='태그', author=self.user_obama)
+        with CaptureQueriesContext(connection) as queries:
+            sync_post_tags(self.post_002, 'hello; a, b; c; d;')
+        with self.assertNumQueries(len(queries)):
+            sync_post_tags(post_many_tags, ';'.join(f'tag{i}' for i in range(20)))
+
+        self.assertEqual(
+            sorted(self.post_002.tags.values_list('name', flat=True)), ['a', 'b', 'c', 'd', 'hello']
+        )
+        self.assertEqual(post_many_tags.tags.count(), 20)
+        self.assertEqual(Tag.objects.get(name='tag0').slug, 'tag0')
+
+        # 바뀐 태그만 반영됨
+        hello_link = self.post_002.tags.through.objects.get(post=self.post_002, tag=self.tag_hello)
+        sync_post_tags(self.post_002, 'hello; e')
+        self.assertEqual(sorted(self.post_002.tags.values_list('name', flat=True)), ['e', 'hello'])
+        self.assertTrue(self.post_002.tags.through.objects.filter(pk=hello_link.pk).exists())
+
+        # slug가 같아지거나 비는 이름도 버리지 않고 번호를 붙임
+        sync_post_tags(self.post_002, 'C++; C#; !!!; ???; Python')
+        slugs = dict(self.post_002.tags.values_list('name', 'slug'))
+        self.assertEqual(slugs, {'C++': 'c-2', 'C#': 'c-3', '!!!': 'tag', '???': 'tag-2', 'Python': 'python-2'})
+
+        # 계산한 slug를 그 사이에 다른 요청이 가져간 경우 (bulk_create에서 빠짐)
+        real_unique_slugs = tags_module.unique_slugs
+        stale = iter([{'C': 'c'}])
+        with mock.patch.object(tags_module, 'unique_slugs', side_effect=lambda names: next(stale, None) or real_unique_slugs(names)):
+            sync_post_tags(self.post_002, 'C')
+        self.assertEqual(Tag.objects.get(name='C').slug, 'c-4')
+
+
+# 검색 인덱스 (blog/search.py)
+class TestSearch(BlogTestCase):
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_search_index(self):
+        post_about_django = Post.objects.create(
+            title='장고 튜토리얼',
+            hook_text='django 입문',
+            content='Hello World',
+            author=self.user_trump,
+        )
+        # 제목에 있는 단어가 본문에만 있는 단어보다 먼저 나옴
+        self.post_002.content = '장고 튜토리얼을 보고 만들었습니다'
+        self.post_002.save()
+
+        self.client.get('/blog/')  # 사이드바 캐시를 채움
+        with self.assertNumQueries(3):
+            response = self.client.get('/blog/search/튜토리얼/')
+        main_area = BeautifulSoup(response.content, 'html.parser').find('div', id='main-area')
+        self.assertIn('Search: 튜토리얼 (2)', main_area.text)
+        titles = [h2.text for h2 in main_area.find_all('h2')]
+        self.assertEqual(titles, [post_about_django.title, self.post_002.title])
+
+        # 태그 추가, 이름 변경, 포스트 삭제가 인덱스에 반영됨
+        post_about_django.tags.add(self.tag_python)
+        response = self.client.get('/blog/search/python/')
+        self.assertIn(post_about_django.title, response.content.decode())
+
+        self.tag_python.name = 'pythonic'
+        self.tag_python.save()
+        response = self.client.get('/blog/search/pythonic/')
+        self.assertIn('Search: pythonic (2)', response.content.decode())
+
+        post_about_django.delete()
+        response = self.client.get('/blog/search/튜토리얼/')
+        self.assertIn('Search: 튜토리얼 (1)', response.content.decode())
+
+
+# 사이드바, 페이지, 조각 캐시와 조건부 GET (blog/cache.py)
+class TestCache(BlogTestCase):
+    def test_sidebar_cache_invalidation(self):
+        self.client.get('/blog/')
+        category_3 = Category.objects.create(name='category3', slug='category3')
+        Post.objects.create(title='새 카테고리 포스트', content='새 카테고리', category=category_3, author=self.user_obama)
+
+        response = self.client.get('/blog/')
+        categories_card = BeautifulSoup(response.content, 'html.parser').find('div', id='categories-card')
+        self.assertIn(f'{category_3.name} (1)', categories_card.text)
+
+        self.post_uncategorized.delete()
+        response = self.client.get('/blog/')
+        categories_card = BeautifulSoup(response.content, 'html.parser').find('div', id='categories-card')
+        self.assertIn('미분류 (0)', categories_card.text)
+
+    def test_anonymous_page_cache(self):
+        detail_url = self.post_001.get_absolute_url()
+        response = self.client.get(detail_url)
+        etag = response['ETag']
+
+        # 캐시된 페이지는 쿼리 없이 나가고, ETag가 같으면 304
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(detail_url).content, response.content)
+            self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
 
+        # 다른 포스트의 댓글은 이 페이지를 무효화하지 않음
+        Comment.objects.create(post=self.post_002, author=self.user_trump, content='다른 포스트의 댓글')
+        with self.assertNumQueries(0):
+            self.client.get(detail_url)
 
+        list_card = BeautifulSoup(self.client.get('/blog/').content, 'html.parser').find('div', id=f'post-{self.post_001.pk}')
+        self.assertEqual(list_card.find('div', class_='card-footer').find('span').text.strip(), '1')
 
+        Comment.objects.create(post=self.post_001, author=self.user_trump, content='새 댓글입니다')
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('새 댓글입니다', response.content.decode())
+        # 목록 카드의 댓글 수도 바뀜
+        list_card = BeautifulSoup(self.client.get('/blog/').content, 'html.parser').find('div', id=f'post-{self.post_001.pk}')
+        self.assertEqual(list_card.find('div', class_='card-footer').find('span').text.strip(), '2')
+
+        # 목록 페이지는 ETag만 보냄. 최신이 아닌 포스트를 지우면 If-Modified-Since만 보내도 새로 그림
+        response = self.client.get('/blog/')
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get('/blog/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        deleted_pk = self.post_002.pk  # 위에서 댓글을 단 post_001이 가장 최근에 수정됨
+        self.post_002.delete()
+        response = self.client.get('/blog/', HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(BeautifulSoup(response.content, 'html.parser').find('div', id=f'post-{deleted_pk}'))
+
+        # 로그인한 사용자는 캐시를 쓰지 않음 (수정 버튼, csrf token)
+        self.client.login(username='obama', password='somepassword')
+        response = self.client.get(detail_url)
+        self.assertTrue(BeautifulSoup(response.content, 'html.parser').find('form', id='comment-form'))
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_post_detail_conditional_get(self):
+        detail_url = self.post_001.get_absolute_url()
+        response = self.client.get(detail_url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        # 템플릿을 그리기 전에 validator 쿼리 하나로 304를 돌려줌
+        with self.assertNumQueries(1):
+            response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        # Last-Modified는 GMT로 바꾼 실제 수정 시각 (TIME_ZONE 시각을 UTC로 보내지 않음)
+        self.assertLessEqual(parse_http_date(last_modified), time.time())
+
+        # 가장 최근 댓글을 지워도 Last-Modified가 뒤로 가지 않음 -> If-Modified-Since만 보내도 다시 그림
+        newest = Comment.objects.create(post=self.post_001, author=self.user_obama, content='지울 댓글')
+        # HTTP date는 초 단위이므로 댓글을 단 시각을 조금 앞으로 당겨둠
+        Post.objects.filter(pk=self.post_001.pk).update(updated_at=newest.modified_at - timedelta(seconds=10))
+        last_modified = self.client.get(detail_url)['Last-Modified']
+        newest.delete()
+        response = self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('지울 댓글', response.content.decode())
+
+        # 댓글이 수정되면 다시 그림
+        self.comment_001.content = '수정된 댓글'
+        self.comment_001.save()
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('수정된 댓글', response.content.decode())
+
+        # 같은 포스트라도 로그인한 사용자에게는 다른 validator
+        self.client.login(username='trump', password='somepassword')
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_fragment_cache(self):
+        def render_list():
+            # PerformanceMiddleware가 Server-Timing에 (적중, 전체) 조각 수를 붙임
+            response = self.client.get('/blog/')
+            hits, total = map(int, re.search(r'frag;desc="(\d+)/(\d+) hits"', response['Server-Timing']).groups())
+            return response, (hits, total - hits)
+
+        with self.settings(BLOG_PAGE_CACHE=False):
+            first, stats = render_list()
+            self.assertEqual(stats, (0, 3))
+            second, stats = render_list()
+            self.assertEqual(stats, (3, 0))
+            self.assertEqual(first.content, second.content)
+
+            # 고친 포스트의 카드만 다시 만들어짐
+            self.post_001.title = '수정된 포스트'
+            self.post_001.save()
+            response, stats = render_list()
+            self.assertEqual(stats, (2, 1))
+            self.assertIn('수정된 포스트', response.content.decode())
+
+            # 댓글 수, 태그 연결이 바뀌어도 그 카드만
+            Comment.objects.create(post=self.post_002, author=self.user_trump, content='두번째 댓글')
+            self.post_uncategorized.tags.add(self.tag_hello)
+            response, stats = render_list()
+            self.assertEqual(stats, (1, 2))
+            card = BeautifulSoup(response.content, 'html.parser').find('div', id=f'post-{self.post_uncategorized.pk}')
+            self.assertIn(self.tag_hello.name, card.text)
+
+            # 카테고리 이름은 여러 카드에 들어가므로 전체를 다시 만듦
+            self.category_1.name = 'programming-2'
+            self.category_1.save()
+            response, stats = render_list()
+            self.assertEqual(stats, (0, 3))
+            self.assertIn('programming-2', response.content.decode())
+
+            # 상세 페이지 본문도 같은 방식. 수정 버튼은 조각 밖에 있어서 사용자마다 다르게 보임
+            self.client.get(self.post_001.get_absolute_url())
+            self.client.login(username='trump', password='somepassword')
+            response = self.client.get(self.post_001.get_absolute_url())
+            self.assertIn('frag;desc="1/1 hits"', response['Server-Timing'])
+            self.assertIn('Edit Post', response.content.decode())
+
+    def test_async_cached_view(self):
+        factory = RequestFactory()
+
+        def get(user=None, **cookies):
+            request = factory.get('/blog/')
+            request.user = user or AnonymousUser()
+            request.COOKIES.update(cookies)
+            response = async_to_sync(views.post_list_async)(request)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        first = get()
+        self.assertEqual(first.status_code, 200)
+        # 두번째부터는 sync view(DB)를 거치지 않고 캐시에서 바로 응답
+        with self.assertNumQueries(0):
+            second = get()
+        self.assertEqual(second.content, first.content)
+
+        # 메모리 캐시가 아니면(redis 등) 캐시 조회를 event loop가 아닌 thread에서 함
+        on_event_loop = []
+        real_get_cached_page = cache_module.get_cached_page
+
+        def get_cached_page(*args):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return real_get_cached_page(*args)
+
+        with mock.patch.object(cache_module, 'cache_is_local', return_value=False), \
+                mock.patch.object(cache_module, 'get_cached_page', side_effect=get_cached_page):
+            with self.assertNumQueries(0):
+                third = get()
+        self.assertEqual(third.content, first.content)
+        self.assertEqual(on_event_loop, [False])
+
+        # 세션 쿠키가 있으면 로그인했을 수 있으므로 sync view로 넘김
+        with CaptureQueriesContext(connection) as queries:
+            get(self.user_trump, **{settings.SESSION_COOKIE_NAME: 'x'})
+        self.assertGreater(len(queries), 0)
+
+
+# 포스트 목록 cursor, 댓글 keyset 페이지
+class TestPagination(BlogTestCase):
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_cursor_pagination(self):
+        for i in range(7):
+            Post.objects.create(title=f'추가 포스트 {i}', content='추가', category=self.category_1, author=self.user_obama)
+        # pk: 1 ~ 10, 한 페이지에 5개
+        self.client.get('/blog/')  # 사이드바 캐시를 채움
+
+        # COUNT(*) 없이 포스트 + 태그 쿼리만 실행됨
+        with self.assertNumQueries(2):
+            response = self.client.get('/blog/?after=9')
+        soup = BeautifulSoup(response.content, 'html.parser')
+        main_area = soup.find('div', id='main-area')
+        self.assertEqual(
+            [card.attrs['id'] for card in main_area.find_all('div', class_='card')],
+            ['post-8', 'post-7', 'post-6', 'post-5', 'post-4']
+        )
+        self.assertEqual(main_area.find('a', text='← Older').attrs['href'], '?after=4')
+        self.assertEqual(main_area.find('a', text='Newer →').attrs['href'], '?before=8')
 
+        response = self.client.get('/blog/?before=8')
+        main_area = BeautifulSoup(response.content, 'html.parser').find('div', id='main-area')
+        self.assertEqual(
+            [card.attrs['id'] for card in main_area.find_all('div', class_='card')],
+            ['post-10', 'post-9']
+        )
+        self.assertEqual(main_area.find('a', text='Newer →').attrs['href'], '#')
+        self.assertEqual(main_area.find('a', text='← Older').attrs['href'], '?after=9')
+
+        with self.settings(BLOG_CURSOR_PAGINATION=True):
+            response = self.client.get(self.category_1.get_absolute_url() + '?after=5')
+        main_area = BeautifulSoup(response.content, 'html.parser').find('div', id='main-area')
+        self.assertEqual(
+            [card.attrs['id'] for card in main_area.find_all('div', class_='card')],
+            ['post-4', 'post-1']
+        )
+        self.assertEqual(main_area.find('a', text='Newer →').attrs['href'], '?before=4')
+
+    @override_settings(BLOG_COMMENTS_PER_PAGE=2)
+    def test_comment_pagination(self):
+        users = [self.user_trump, self.user_obama]
+        comments = [self.comment_001] + [
+            Comment.objects.create(post=self.post_001, author=users[i % 2], content=f'댓글 {i}') for i in range(4)
+        ]
+        # 같은 시각에 달린 댓글은 pk로 순서를 정함
+        Comment.objects.filter(pk__in=[c.pk for c in comments[1:4]]).update(created_at=comments[1].created_at)
+
+        def comment_ids(html):
+            return [int(div['id'].split('-')[1]) for div in BeautifulSoup(html, 'html.parser').select('div.media[id^=comment-]')]
+
+        # 상세 페이지에는 최근 댓글 2개만
+        response = self.client.get(self.post_001.get_absolute_url())
+        soup = BeautifulSoup(response.content, 'html.parser')
+        comment_list = soup.find('div', id='comment-list')
+        self.assertEqual(comment_ids(str(comment_list)), [comments[3].pk, comments[4].pk])
+        fragment_url = comment_list.find('a', attrs={'data-fragment-url': True})['data-fragment-url']
+
+        # 이전 댓글은 fragment로, 작성자/아바타는 댓글 수와 상관없이 한번에
+        with self.assertNumQueries(2):  # post 확인, 댓글 + 작성자 (아바타는 상세 페이지에서 캐시됨)
+            data = self.client.get(fragment_url).json()
+        self.assertEqual(comment_ids(data['html']), [comments[1].pk, comments[2].pk])
+        self.assertEqual(data['count'], 2)
+        data = self.client.get(f'/blog/{self.post_001.pk}/comments/?before={data["next"]}').json()
+        self.assertEqual(comment_ids(data['html']), [comments[0].pk])
+        self.assertIsNone(data['next'])
+        self.assertNotIn('data-fragment-url', data['html'])
+
+        # JS 없이 링크를 따라가도 같은 댓글
+        href = comment_list.find('a', attrs={'data-fragment-url': True})['href']
+        response = self.client.get(self.post_001.get_absolute_url() + href.split('#')[0])
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(comment_ids(str(soup.find('div', id='comment-list'))), [comments[1].pk, comments[2].pk])
+        self.assertEqual(self.client.get('/blog/999/comments/').status_code, 404)
+
+
+# 쿼리 수, 요청 통계, 가짜 데이터와 벤치마크 명령
+class TestPerformance(BlogTestCase):
+    @override_settings(BLOG_PAGE_CACHE=False)
+    def test_post_list_num_queries(self):
+        # 포스트, 태그, 카테고리가 늘어나도 쿼리 수는 그대로여야 함
+        def add_posts(n):
+            for i in range(n):
+                category = Category.objects.create(name=f'extra{Category.objects.count()}', slug=f'extra{Category.objects.count()}')
+                post = Post.objects.create(title=f'추가 포스트 {i}', content='추가', category=category, author=self.user_obama)
+                post.tags.add(*self.tags)
+
+        for _ in range(2):
+            self.client.get('/blog/')  # 사이드바 캐시를 채움
+            with self.assertNumQueries(3):
+                self.client.get('/blog/')
+            with self.assertNumQueries(3):
+                self.client.get(self.category_1.get_absolute_url())
+            with self.assertNumQueries(3):
+                self.client.get(self.tag_hello.get_absolute_url())
+            add_posts(5)
+
+    def test_performance_middleware(self):
+        with tempfile.TemporaryDirectory() as stats_dir, \
+                self.settings(PERF_STATS_DIR=stats_dir, PERF_FLUSH_INTERVAL=0, BLOG_PAGE_CACHE=False):
+            response = self.client.get(self.post_001.get_absolute_url())
+            self.assertRegex(response['Server-Timing'], r'^sql;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, (frag;desc="\d+/\d+ hits", )?total;dur=[\d.]+$')
+
+            stats = perf.load_stats(stats_dir)
+            self.assertGreaterEqual(stats['blog.views.PostDetail']['count'], 1)
+            self.assertGreater(stats['blog.views.PostDetail']['template_ms'], 0)
+
+            out = StringIO()
+            call_command('perf_report', '--dir', stats_dir, stdout=out)
+            self.assertIn('blog.views.PostDetail', out.getvalue())
+
+            # 파일은 lock을 놓고 나서 씀 (다른 요청의 record를 기다리게 하지 않음)
+            histogram = perf.Histogram()
+            with mock.patch.object(perf.json, 'dump', side_effect=lambda *args: self.assertFalse(histogram.lock.locked())) as dump:
+                histogram.record('view', 1, 0, 0, 0)
+            dump.assert_called_once()
+
+    def test_query_plans_use_indexes(self):
+        synthetic.seed(users=3, categories=3, tags=20, posts=300, comments_per_post=3, random_seed=1, index=False)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')  # 통계가 있어야 planner가 실제 데이터 기준으로 고름
+
+        post = Post.objects.filter(author__username__startswith='bench_user_').first()
+        tag = Tag.objects.filter(slug__startswith='bench-tag-').first()
+        # 각 view의 주 쿼리. 전체 포스트 목록(ORDER BY id DESC LIMIT)은 pk 순서 그대로 읽으므로 제외
+        querysets = {
+            'category_page': get_post_queryset().filter(category=post.category)[:5],
+            'no_category_page': get_post_queryset().filter(category=None)[:5],
+            'tag_page': get_post_queryset().filter(tags=tag)[:5],
+            'tag_header': Tag.objects.filter(slug=tag.slug),
+            'post_detail': get_post_queryset().filter(pk=post.pk),
+            'post_detail_comments': Comment.objects.filter(post_id=post.pk).select_related('author').order_by('-created_at', '-pk')[:21],
+            'sidebar_no_category_count': Post.objects.filter(category=None).values('pk'),
+        }
+        # sqlite: "SCAN blog_post" (USING INDEX 없이), postgresql: "Seq Scan on blog_post"
+        full_scan = re.compile(r'\bSCAN (blog_post|blog_comment|blog_tag)\w*\s*$|Seq Scan on (blog_\w+)', re.MULTILINE)
+        for name, queryset in querysets.items():
+            plan = queryset.explain()
+            self.assertIsNone(full_scan.search(plan), f'{name}:\n{plan}')
+
+    def test_seed_blog(self):
+        call_command('seed_blog', '--posts', '25', '--users', '3', '--tags', '10', '--categories', '2',
+                     '--comments-per-post', '2', '--batch-size', '10', stdout=StringIO())
+        self.assertEqual(Post.objects.filter(author__username__startswith='bench_user_').count(), 25)
+        self.assertEqual(Post.tags.through.objects.filter(tag__slug__startswith='bench-tag-').count(), 75)
+        first = Post.objects.filter(author__username__startswith='bench_user_').order_by('pk').first()
+        self.assertTrue(first.content_html)
+
+        # 같은 seed로 다시 만들면 같은 내용이 만들어지고, 사용자/태그는 다시 만들지 않음
+        titles = list(Post.objects.filter(author__username__startswith='bench_user_').order_by('pk').values_list('title', flat=True))
+        call_command('seed_blog', '--posts', '25', '--users', '3', '--tags', '10', '--categories', '2',
+                     '--comments-per-post', '2', '--batch-size', '10', stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='bench_user_').count(), 3)
+        second_titles = list(Post.objects.filter(author__username__startswith='bench_user_').order_by('pk').values_list('title', flat=True))[25:]
+        self.assertEqual(titles, second_titles)
+
+        self.assertIn(first.pk, search.search_post_ids(first.title))
+
+    def test_bench_blog(self):
+        # 테스트 안에서는 임시 DB를 따로 만들지 않고 이 테스트의 DB에 데이터를 만들어서 측정
+        bench = 'blog.management.commands.bench_blog.'
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch(bench + 'setup_test_environment'), mock.patch(bench + 'teardown_test_environment'), \
+                mock.patch.object(connection.creation, 'create_test_db'), \
+                mock.patch.object(connection.creation, 'destroy_test_db'):
+            # 로그인 route는 synthetic 사용자(비밀번호 benchmark)로 요청하므로 빈 DB처럼 setUp의 포스트는 지움
+            Post.objects.all().delete()
+            output = os.path.join(tmp, 'bench.json')
+            options = ['--posts', '5', '--users', '1', '--requests', '1', '--warmup', '0']
+            call_command('bench_blog', *options, '--output', output, stdout=StringIO())
+            with open(output) as f:
+                result = json.load(f)
+            self.assertEqual(result['meta']['mode'], 'client')
+            self.assertEqual(result['meta']['dataset']['posts'], 5)
+            for name in ('landing', 'about_me', 'post_list', 'post_detail', 'category_page', 'search', 'tag_page',
+                         'post_detail_logged_in', 'create_post_form', 'new_comment', 'delete_comment'):
+                self.assertIn(name, result['routes'])
+                self.assertLessEqual({'p50_ms', 'p95_ms', 'p99_ms', 'queries'}, set(result['routes'][name]))
+            self.assertEqual(result['routes']['post_detail']['status'], [200])
+
+            # 이전 결과보다 p95가 크게 늘면 --fail-on-regression으로 실패
+            for r in result['routes'].values():
+                r['p95_ms'] = 0.000001
+            baseline = os.path.join(tmp, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump(result, f)
+            with self.assertRaisesMessage(CommandError, 'regressed: landing'):
+                call_command('bench_blog', *options, '--baseline', baseline, '--fail-on-regression', stdout=StringIO())
+
+
+# DB 설정, replica routing, sqlite 튜닝 (do_it_django_prj/db.py)
+class TestDatabase(BlogTestCase):
+    def test_database_config(self):
+        self.assertEqual(db.database_config({}, sqlite_path='test.sqlite3')['default']['ENGINE'], 'django.db.backends.sqlite3')
+
+        databases = db.database_config({
+            'DJANGO_DB_ENGINE': 'postgresql',
+            'POSTGRES_HOST': 'pgbouncer',
+            'POSTGRES_PORT': '6432',
+            'DJANGO_DB_POOLER': 'pgbouncer',
+            'DJANGO_DB_REPLICAS': 'replica-a, replica-b:5433',
+        })
+        self.assertEqual(list(databases), ['default', 'replica_0', 'replica_1'])
+        self.assertEqual(databases['default']['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 60)
+        self.assertFalse(databases['default']['CONN_HEALTH_CHECKS'])  # 요청마다 왕복이 하나 늘어나므로 켜야 씀
+        self.assertTrue(databases['default']['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertEqual((databases['replica_0']['HOST'], databases['replica_0']['PORT']), ('replica-a', '6432'))
+        self.assertEqual((databases['replica_1']['HOST'], databases['replica_1']['PORT']), ('replica-b', '5433'))
+        self.assertEqual(databases['replica_1']['TEST'], {'MIRROR': 'default'})
+
+    def test_database_health_checks(self):
+        # DATABASES['default']에 CONN_HEALTH_CHECKS, CONN_MAX_AGE를 켠 것과 같음
+        with mock.patch.object(db, 'replica_aliases', return_value=['replica_0']):
+            middleware = DatabaseMiddleware(lambda request: HttpResponse())
+        middleware.health_checks = ['default']
+        connection.ensure_connection()
+        request = RequestFactory().get('/')
+
+        with mock.patch.object(connection, 'is_usable', return_value=True) as is_usable:
+            middleware(request)  # 처음 보는 connection은 확인함
+            middleware(request)  # 방금 쓴 connection은 확인하지 않음
+            self.assertEqual(is_usable.call_count, 1)
+            connection.health_check_last_used -= middleware.idle_seconds + 1
+            middleware(request)
+            self.assertEqual(is_usable.call_count, 2)
+
+    def test_replica_routing(self):
+        with mock.patch.object(db, 'replica_aliases', return_value=['replica_0']):
+            router = db.PrimaryReplicaRouter()
+            middleware_for = lambda view: DatabaseMiddleware(view)
+
+        @db.read_from_replica
+        def read_view(request):
+            return HttpResponse(router.db_for_read(Post))
+
+        @db.read_from_replica
+        def write_then_read_view(request):
+            router.db_for_write(Post)
+            return HttpResponse(router.db_for_read(Post))
+
+        def plain_view(request):
+            return HttpResponse(router.db_for_read(Post))
+
+        factory = RequestFactory()
+        with mock.patch.object(db, 'replica_aliases', return_value=['replica_0']):
+            read, write_then_read, plain = map(middleware_for, (read_view, write_then_read_view, plain_view))
+
+        # 표시된 view의 GET만 replica로
+        self.assertEqual(read(factory.get('/')).content, b'replica_0')
+        self.assertEqual(read(factory.post('/')).content, b'default')
+        self.assertEqual(plain(factory.get('/')).content, b'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+        # 쓰고 나면 같은 요청의 나머지와, 쿠키가 있는 다음 요청은 primary에서 읽음
+        response = write_then_read(factory.get('/'))
+        self.assertEqual(response.content, b'default')
+        self.assertIn(db.PIN_COOKIE, response.cookies)
+        request = factory.get('/')
+        request.COOKIES[db.PIN_COOKIE] = '1'
+        self.assertEqual(read(request).content, b'default')
+
+    def test_sqlite_tuning(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('sqlite only')
+
+        def pragmas(**tuning):
+            # 테스트 DB(in-memory)와 별개인 파일 DB connection을 새로 열어서 확인
+            with tempfile.TemporaryDirectory() as directory, override_settings(**tuning):
+                other = connections['default'].__class__({**connection.settings_dict, 'NAME': f'{directory}/tuning.sqlite3'})
+                try:
+                    with other.cursor() as cursor:  # connection_created -> tune_sqlite
+                        values = []
+                        for name in ('journal_mode', 'cache_size', 'synchronous'):
+                            cursor.execute(f'PRAGMA {name}')
+                            values.append(cursor.fetchone()[0])
+                        return tuple(values)
+                finally:
+                    other.close()
+
+        self.assertEqual(pragmas(SQLITE_TUNING=False), ('delete', -2000, 2))
+        self.assertEqual(pragmas(SQLITE_TUNING=True), ('wal', db.SQLITE_PRAGMAS['cache_size'], 1))  # 1 = NORMAL
+
+
+# 작업 큐 (blog/tasks.py)
+class TestTasks(BlogTestCase):
+    @override_settings(BLOG_TASKS_EAGER=False)
+    def test_task_queue(self):
+        # 작업은 transaction이 commit될 때 큐에 들어감
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Post.objects.create(title='큐에 넣을 포스트', content='검색 인덱스는 worker가 만듦', author=self.user_trump)
+            post.tags.add(self.tag_hello)
+            post.save()
+            self.assertEqual(Task.objects.count(), 0)
+        for callback in callbacks:
+            callback()
+
+        # 저장 + 태그 변경으로 여러번 enqueue 되어도 같은 작업은 하나만 남음
+        self.assertEqual(Task.objects.filter(name='blog.tasks.index_posts').count(), 1)
+        self.assertNotIn(post.pk, search.search_post_ids('worker'))
+        search_url = '/blog/search/worker/'
+        self.assertNotIn('큐에 넣을 포스트', self.client.get(search_url).content.decode())
+
+        self.assertEqual(tasks.run_pending('test-worker'), (1, 0))
+        self.assertEqual(Task.objects.count(), 0)
+        self.assertIn(post.pk, search.search_post_ids('worker'))
+        # 인덱스가 바뀌기 전에 캐시된 검색 결과 페이지는 버려짐
+        self.assertIn('큐에 넣을 포스트', self.client.get(search_url).content.decode())
+
+        # 실패하면 늦춰서 다시 시도하고, max_attempts번 실패하면 FailedTask로 옮김
+        with mock.patch.object(search, 'index_posts', side_effect=RuntimeError('index down')):
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks.enqueue('blog.tasks.index_posts', [[post.pk]], max_attempts=3)
+            self.assertEqual(tasks.run_pending('test-worker'), (0, 1))
+            task_row = Task.objects.get()
+            self.assertEqual(task_row.attempts, 1)
+            self.assertIn('index down', task_row.last_error)
+            self.assertEqual(tasks.run_pending('test-worker'), (0, 0))  # 아직 run_after 전
+
+            # 다시 시도를 기다리는 작업에는 합치지 않음
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks.index_posts.delay([post.pk])
+            self.assertEqual(Task.objects.filter(attempts=0).count(), 1)
+            Task.objects.filter(attempts=0).delete()
+
+            for _ in range(task_row.max_attempts - 1):
+                Task.objects.update(run_after=task_row.created_at)
+                tasks.run_pending('test-worker')
+        self.assertEqual(Task.objects.count(), 0)
+        failed = FailedTask.objects.get()
+        self.assertEqual(
+            (failed.name, failed.args, failed.attempts, failed.max_attempts), ('blog.tasks.index_posts', [[post.pk]], 3, 3),
+        )
+
+        # worker 명령으로 다시 넣고(원래 max_attempts 그대로) 실행
+        call_command('run_tasks', '--requeue-failed', stdout=StringIO())
+        self.assertEqual(FailedTask.objects.count(), 0)
+        self.assertEqual(Task.objects.get().max_attempts, 3)
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 0)
+
+
+# 이미지 derivative, static 파일, 업로드 파일 다운로드
+class TestMedia(BlogTestCase):
+    def test_head_image_derivatives(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            buffer = BytesIO()
+            Image.new('RGB', (1600, 600), (200, 100, 50)).save(buffer, 'JPEG')
+            post = Post.objects.create(
+                title='사진 포스트', content='사진', author=self.user_trump,
+                head_image=SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            )
+
+            # 업로드할 때 크기별 파일이 만들어짐 (원본보다 크게는 만들지 않음)
+            derivatives = thumbnails.get_derivatives(post.head_image.name)
+            self.assertEqual([width for _, width in derivatives['jpg']], [400, 800, 1200])
+            for name, width in derivatives['jpg']:
+                with default_storage.open(name) as f:
+                    self.assertEqual(Image.open(f).size, (width, round(600 * width / 1600)))
+
+            response = self.client.get('/blog/')
+            soup = BeautifulSoup(response.content, 'html.parser')
+            picture = soup.find('div', id=f'post-{post.pk}').find('picture')
+            self.assertIn('_400w.jpg 400w', picture.img['srcset'])
+            self.assertIn('_800w.jpg', picture.img['src'])
+            self.assertIn('card-img-top', picture.img['class'])
+            if 'webp' in derivatives:
+                self.assertIn('_1200w.webp 1200w', picture.source['srcset'])
+
+            # 파일이 없어져도 backfill 명령으로 다시 만듦
+            thumbnails.delete_derivatives(post.head_image.name)
+            self.assertFalse(default_storage.exists(derivatives['jpg'][0][0]))
+            call_command('build_image_derivatives', stdout=StringIO())
+            self.assertTrue(default_storage.exists(derivatives['jpg'][0][0]))
+
+            # head_image를 바꾸면 이전 이미지의 파일은 지워짐 (원본 폭으로 만든 300w 포함)
+            buffer = BytesIO()
+            Image.new('RGB', (300, 100), (50, 100, 200)).save(buffer, 'JPEG')
+            post.head_image = SimpleUploadedFile('small.jpg', buffer.getvalue(), content_type='image/jpeg')
+            post.save()
+            for name, _ in derivatives['jpg']:
+                self.assertFalse(default_storage.exists(name))
+            small = thumbnails.get_derivatives(post.head_image.name)
+            self.assertEqual([width for _, width in small['jpg']], [300])
+
+            # 같은 파일을 쓰는 다른 포스트가 있으면 남겨두고, 마지막 포스트가 지워질 때 지움
+            other = Post.objects.create(
+                title='같은 사진', content='사진', author=self.user_trump, head_image=post.head_image.name,
+            )
+            post.delete()
+            self.assertTrue(default_storage.exists(small['jpg'][0][0]))
+            other.delete()
+            for files in small.values():
+                for name, _ in files:
+                    self.assertFalse(default_storage.exists(name))
+
+    def test_static_files(self):
+        with tempfile.TemporaryDirectory() as static_root, override_settings(
+            STATIC_ROOT=static_root,
+            STATICFILES_STORAGE='do_it_django_prj.staticfiles.BlogStaticFilesStorage',
+            STATIC_CSS_PURGE=['blog/bootstrap/bootstrap.min.css'],
+        ):
+            # admin 등은 압축하는 데 오래 걸리므로 빼고
+            call_command('collectstatic', '--noinput', '-i', 'admin', '-i', 'django_extensions', verbosity=0)
+
+            # 템플릿에는 해시가 붙은 이름이 나감
+            response = self.client.get('/blog/')
+            soup = BeautifulSoup(response.content, 'html.parser')
+            css_url = soup.find('link', rel='stylesheet')['href']
+            self.assertRegex(css_url, r'^/static/blog/bootstrap/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+            # 쓰는 class의 규칙만 남음
+            with open(static_root + css_url[len('/static'):], encoding='utf-8') as f:
+                css = f.read()
+            self.assertIn('.card{', css)
+            self.assertIn('.navbar-expand-lg', css)
+            self.assertNotIn('.carousel-item', css)
+            self.assertLess(len(css), 80000)
+
+            # 미리 압축한 파일을 immutable 캐시와 함께 보냄
+            response = Client().get(css_url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('max-age=315360000', response['Cache-Control'])
+            response = Client().get(css_url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_media_downloads(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            data = bytes(range(256)) * 40
+            post = Post.objects.create(
+                title='첨부파일', content='첨부', author=self.user_trump,
+                file_upload=SimpleUploadedFile('data.csv', data, content_type='text/csv'),
+            )
+            url = post.file_upload.url
+
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), data)
+            self.assertEqual(response['Accept-Ranges'], 'bytes')
+            self.assertTrue(response['Content-Disposition'].startswith('attachment;'))
+            etag = response['ETag']
+
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(data)}')
+            self.assertEqual(b''.join(response.streaming_content), data[100:200])
+            response = self.client.get(url, HTTP_RANGE='bytes=-10')
+            self.assertEqual(b''.join(response.streaming_content), data[-10:])
+            # 파일이 바뀌었으면(If-Range 불일치) 전체를 보냄
+            response = self.client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(data)}-').status_code, 416)
+            self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+
+            # 앞단 서버로 넘기면 worker는 헤더만 보내고, proxy(여기서는 SendfileProxy)가 파일을 보냄
+            with override_settings(MEDIA_ACCEL='x-accel-redirect'):
+                response = self.client.get(url)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['X-Accel-Redirect'], '/_media/' + post.file_upload.name)
+
+                application = SendfileProxy(get_wsgi_application())
+                environ = {'PATH_INFO': url, 'HTTP_HOST': 'testserver', 'HTTP_RANGE': 'bytes=10-19'}
+                setup_testing_defaults(environ)
+                started = []
+                body = b''.join(application(environ, lambda status, headers: started.append((status, dict(headers)))))
+                status, headers = started[0]
+                self.assertEqual(status, '206 Partial Content')
+                self.assertEqual(body, data[10:20])
+                self.assertTrue(headers['Content-Disposition'].startswith('attachment;'))
+
+
+# 카운터 컬럼 (blog/counters.py)
+class TestCounters(BlogTestCase):
+    def test_counters(self):
+        def counts():
+            return (
+                Post.objects.get(pk=self.post_001.pk).comment_count,
+                Category.objects.get(pk=self.category_1.pk).post_count,
+                Category.objects.get(pk=self.category_2.pk).post_count,
+                Tag.objects.get(pk=self.tag_hello.pk).post_count,
+                Tag.objects.get(pk=self.tag_python.pk).post_count,
+            )
+
+        # setUp에서 만든 데이터가 signal로 세어져 있음
+        self.assertEqual(counts(), (1, 1, 1, 1, 1))
+        self.assertEqual(counters.reconcile(dry_run=True), {
+            'post.comment_count': 0, 'category.post_count': 0, 'tag.post_count': 0,
+        })
+
+        # 댓글 작성/삭제 (new_comment, delete_comment)
+        self.client.login(username='obama', password='somepassword')
+        self.client.post(f'/blog/{self.post_001.pk}/new_comment/', {'content': '두 번째 댓글'})
+        self.assertEqual(counts()[0], 2)
+        comment = Comment.objects.get(content='두 번째 댓글')
+        self.client.get(f'/blog/delete_comment/{comment.pk}/')
+        self.assertEqual(counts()[0], 1)
+
+        # 불러온 instance를 저장해도 그 사이에 바뀐 카운터를 덮어쓰지 않음
+        post = Post.objects.get(pk=self.post_001.pk)
+        Comment.objects.create(post=self.post_001, author=self.user_obama, content='세 번째 댓글')
+        post.title = '제목 수정'
+        post.category = self.category_2
+        post.save()
+        self.assertEqual(counts()[:3], (2, 0, 2))
+
+        # 그 밖의 save()는 Django 기본과 같음: 다른 곳에서 행이 지워졌으면 다시 INSERT
+        tag = Tag.objects.create(name='지워질 태그', slug='deleted-tag')
+        Tag.objects.filter(pk=tag.pk).delete()
+        tag.save()
+        self.assertEqual(Tag.objects.get(pk=tag.pk).name, '지워질 태그')
+
+        # 태그 연결 (정방향/역방향, 연결되지 않은 태그 remove)
+        post.tags.remove(self.tag_hello, self.tag_python_kor)
+        self.tag_python.post_set.add(post)
+        self.assertEqual(counts()[3:], (0, 2))
+        self.tag_python.post_set.clear()
+        self.assertEqual(counts()[3:], (0, 0))
+
+        # 포스트 삭제: 카테고리, 태그 연결
+        self.post_002.delete()
+        self.post_uncategorized.delete()
+        self.assertEqual(counts()[2], 1)
+        self.assertEqual(Tag.objects.get(pk=self.tag_python_kor.pk).post_count, 0)
+
+        # 사이드바와 태그 페이지는 GROUP BY 집계 없이 카운터를 읽음
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.tag_python.get_absolute_url())
+        self.assertFalse([q['sql'] for q in queries if 'GROUP BY' in q['sql']])
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIn(f'{self.tag_python} (0)', soup.find('h1').text)
+        self.assertIn(f'{self.category_2.name} (1)', soup.find('div', id='categories-card').text)
+
+        # signal 없이 바뀐 것은 reconcile_counters로 맞춤
+        Post.objects.filter(pk=post.pk).update(comment_count=99)
+        Tag.objects.filter(pk=self.tag_python.pk).update(post_count=5)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('post.comment_count: 1 row(s) fixed', out.getvalue())
+        self.assertEqual(counts(), (2, 0, 1, 0, 0))
+
+
+# 운영 설정, 템플릿 캐시, worker 시작 시간
+class TestSettings(BlogTestCase):
+    def test_template_cache(self):
+        names = template_names()
+        self.assertIn('blog/post_card.html', names)
+        self.assertIn('single_pages/landing.html', names)
+        # 개발 설정(cached loader 없음)에서는 아무것도 하지 않음
+        self.assertEqual(warm_templates(), 0)
+
+        cached_templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=template_loaders(cached=True),
+        ))]
+        with self.settings(TEMPLATES=cached_templates, BLOG_PAGE_CACHE=False, BLOG_FRAGMENT_CACHE=False):
+            self.assertEqual(warm_templates(), len(names))
+            # 미리 컴파일했으므로 요청 중에는 템플릿 파일을 읽지 않음
+            with mock.patch('django.template.loaders.filesystem.Loader.get_contents') as get_contents:
+                for path in ('/blog/', self.post_001.get_absolute_url(), '/'):
+                    self.assertEqual(self.client.get(path).status_code, 200)
+            get_contents.assert_not_called()
+
+    def test_startup_budget(self):
+        # 운영 설정에는 개발용 app이 없음
+        with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'test', 'DJANGO_ALLOWED_HOSTS': 'example.com'}):
+            prod = importlib.import_module('do_it_django_prj.settings.prod')
+        self.assertNotIn('django_extensions', prod.INSTALLED_APPS)
+        self.assertIn('django_extensions', settings.INSTALLED_APPS)
+        self.assertEqual((prod.DEBUG, prod.TEMPLATE_CACHE, prod.ALLOWED_HOSTS), (False, True, ['example.com']))
+        # 운영에서는 저장 후의 일을 요청 안에서 하지 않고 worker가 처리
+        self.assertFalse(prod.BLOG_TASKS_EAGER)
+
+        stream = StringIO()
+        self.assertTrue(startup.check_budget(10, {'blog': 8}, 20, stream))
+        self.assertFalse(startup.check_budget(50, {'auth': 10, 'blog': 30}, 20, stream))
+        self.assertIn('slowest apps: blog 30ms, auth 10ms', stream.getvalue())
+
+        # 새 process에서 wsgi.py를 import해서 app별 시간을 잼
+        out = StringIO()
+        call_command('startup_report', '--runs', '1', '--budget', '60000', '--fail-over-budget', stdout=out)
+        self.assertRegex(out.getvalue(), r'\nblog +[\d.]+\n')
+        self.assertIn('boot:', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('startup_report', '--runs', '1', '--budget', '1', '--fail-over-budget', stdout=StringIO())
@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import re
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# head_image를 원본 해상도 그대로 보내지 않도록, 폭별로 줄인 WebP/JPEG 파일(derivative)을 만들어두고
+# 템플릿에서는 srcset으로 보냄 (templatetags/blog_images.py).
+# 업로드할 때(signals) 만들고, 없으면 처음 요청될 때 만듦. 기존 이미지는 manage.py build_image_derivatives
+
+DERIVATIVE_WIDTHS = getattr(settings, 'BLOG_IMAGE_WIDTHS', (400, 800, 1200))
+DERIVATIVE_DIR = 'blog/derivatives'
+DERIVATIVE_CACHE_TIMEOUT = getattr(settings, 'BLOG_IMAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# (확장자, Pillow format, mime type, 저장 옵션)
+FORMATS = [
+    ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+if not features.check('webp'):
+    FORMATS = FORMATS[1:]
+
+
+def derivative_name(name, width, ext):
+    root, _ = os.path.splitext(name)
+    return f'{DERIVATIVE_DIR}/{root}_{width}w.{ext}'
+
+
+def derivative_widths(original_width):
+    # 원본보다 크게 늘리지는 않음. 원본이 최대 폭보다 작으면 원본 폭도 하나 만듦
+    widths = {width for width in DERIVATIVE_WIDTHS if width < original_width}
+    widths.add(min(original_width, DERIVATIVE_WIDTHS[-1]))
+    return sorted(widths)
+
+
+def derivatives_cache_key(name):
+    return f'blog:derivatives:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def generate_derivatives(name, force=False):
+    # name 이미지의 크기별 파일을 만듦 (force가 아니면 이미 있는 파일은 그대로 둠).
+    # {ext: [(storage 이름, 폭), ...]}을 돌려주고 get_derivatives가 쓰도록 캐시함
+    with default_storage.open(name) as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)  # 휴대폰 사진의 회전 정보를 반영
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    derivatives = {ext: [] for ext, _, _, _ in FORMATS}
+    for width in derivative_widths(image.width):
+        resized = None
+        for ext, image_format, _, options in FORMATS:
+            target = derivative_name(name, width, ext)
+            derivatives[ext].append((target, width))
+            if default_storage.exists(target):
+                if not force:
+                    continue
+                default_storage.delete(target)
+            if resized is None:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+            out = resized.convert('RGB') if image_format == 'JPEG' else resized
+            buffer = io.BytesIO()
+            out.save(buffer, image_format, **options)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+
+    cache.set(derivatives_cache_key(name), derivatives, DERIVATIVE_CACHE_TIMEOUT)
+    return derivatives
+
+
+def get_derivatives(name):
+    # 캐시에 없으면 파일을 확인하고(없으면 만들고) 다시 캐시. 원본을 읽을 수 없으면 None
+    if not name:
+        return None
+    key = derivatives_cache_key(name)
+    derivatives = cache.get(key)
+    if derivatives is None:
+        try:
+            derivatives = generate_derivatives(name)
+        except (OSError, ValueError):
+            # 원본 파일이 없거나 이미지가 아님 -> 템플릿에서 원본 URL을 그대로 씀
+            derivatives = {}
+            cache.set(key, derivatives, DERIVATIVE_CACHE_TIMEOUT)
+    return derivatives or None
+
+
+def delete_derivatives(name):
+    # 원본 폭으로 만든 파일(DERIVATIVE_WIDTHS에 없는 폭)도 있으므로 디렉터리에서 이름으로 찾음
+    directory, root = os.path.split(f'{DERIVATIVE_DIR}/{os.path.splitext(name)[0]}')
+    exts = '|'.join(ext for ext, _, _, _ in FORMATS)
+    pattern = re.compile(rf'{re.escape(root)}_\d+w\.({exts})$')
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        files = []
+    for filename in files:
+        if pattern.match(filename):
+            default_storage.delete(f'{directory}/{filename}')
+    cache.delete(derivatives_cache_key(name))
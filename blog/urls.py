@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -7,11 +8,26 @@ urlpatterns = [
     path('update_comment/<int:pk>/', views.CommentUpdate.as_view()),
     path('update_post/<int:pk>/', views.PostUpdate.as_view()),
     path('create_post/', views.PostCreate.as_view()),
-    path('tag/<str:slug>/', views.tag_page),
-    path('category/<str:slug>/', views.category_page),
     path('<int:pk>/new_comment/', views.new_comment),
-    path('<int:pk>/', views.PostDetail.as_view()),
-    path('', views.PostList.as_view()),
+    path('<int:pk>/comments/', views.comment_list),
+]
+
+if settings.BLOG_ASYNC_VIEWS:
+    urlpatterns += [
+        path('tag/<str:slug>/', views.tag_page_async),
+        path('category/<str:slug>/', views.category_page_async),
+        path('<int:pk>/', views.post_detail_async),
+        path('', views.post_list_async),
+    ]
+else:
+    urlpatterns += [
+        path('tag/<str:slug>/', views.tag_page),
+        path('category/<str:slug>/', views.category_page),
+        path('<int:pk>/', views.PostDetail.as_view()),
+        path('', views.PostList.as_view()),
+    ]
+
+urlpatterns += [
     # path('<int:pk>/', views.singe_post_page),
     # path('', views.index),
 ]
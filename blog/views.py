@@ -1,12 +1,22 @@
 from django.shortcuts import render, redirect
+from django.conf import settings
+from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404
 from .models import Post, Category, Tag, Comment
 from .forms import CommentForm
+from .search import search_post_ids
+from .avatars import prefetch_avatar_urls
+from .tags import sync_post_tags
+from .pagination import CursorPaginationMixin, paginate_post_list, paginate_comments
+from .cache import anonymous_page_cache, async_cached_view, list_page_versions, post_page_versions, comment_page_versions, get_version_string
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.core.exceptions import PermissionDenied
-from django.utils.text import slugify
-from django.db.models import Q
+from django.utils import timezone
+from do_it_django_prj.db import read_from_replica
 
 # Create your views here.
 # context는 dict타입
@@ -14,15 +24,24 @@ from django.db.models import Q
 # 추가로 categories 등을 추가시킬 수 있
 
 
-class PostList(ListView):
+def get_post_queryset():
+    # 카드에 보여주는 category, author, tags를 한번에 가져옴 -> 포스트 개수와 상관없이 쿼리 수가 일정함
+    return Post.objects.select_related('category', 'author').prefetch_related('tags').order_by('-pk')
+
+
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(anonymous_page_cache(list_page_versions), name='dispatch')
+class PostList(CursorPaginationMixin, ListView):
     model = Post
     ordering = '-pk'
     paginate_by = 5
 
+    def get_queryset(self):
+        return get_post_queryset()
+
     def get_context_data(self, **kwargs):
         context = super(PostList, self).get_context_data()
-        context['categories'] = Category.objects.all()
-        context['no_category_post_count'] = Post.objects.filter(category=None).count()
+        # 사이드바(categories, no_category_post_count)는 context_processors.sidebar에서 캐시로 넘겨줌
         # objects.filter(): 여러개 걸러냄
         # objects.get(): unique한 variable(ex. pk)로 하나만 가져옴
 
@@ -30,30 +49,63 @@ class PostList(ListView):
 
 
 class PostSearch(PostList):
-    paginate_by = None
+    template_name = 'blog/post_list.html'
+    context_object_name = 'post_list'
+    cursor_pagination = False  # 관련도 순이라 pk cursor를 쓸 수 없음
 
     def get_queryset(self):
+        # 검색 인덱스에서 관련도 순으로 pk만 가져옴 (쿼리 1번). 실제 포스트는 현재 페이지 것만 가져옴
         q = self.kwargs['q']
-        post_list = Post.objects.filter(
-            Q(title__contains=q) | Q(tags__name__contains=q)
-        ).distinct()
-        return post_list
+        return search_post_ids(q)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, post_ids, is_paginated = super(PostSearch, self).paginate_queryset(queryset, page_size)
+        posts = get_post_queryset().in_bulk(post_ids)
+        page.object_list = [posts[pk] for pk in post_ids if pk in posts]
+        return paginator, page, page.object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         context = super(PostSearch, self).get_context_data()
         q = self.kwargs['q']
-        context['search_info'] = f'Search: {q} ({self.get_queryset().count()})'
+        context['search_info'] = f'Search: {q} ({context["paginator"].count})'
         return context
 
 
+def get_post_last_modified(request, pk):
+    # 포스트의 updated_at. 댓글/태그가 바뀔 때도 signals(touch_posts)에서 올리므로 앞으로만 감.
+    # etag, last_modified 둘 다 쓰므로 request에 저장해둠
+    if not hasattr(request, '_post_last_modified'):
+        updated_at = Post.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        # USE_TZ=False라 TIME_ZONE 기준 naive 값. condition()은 naive를 UTC로 보므로 aware로 바꿔서 넘김
+        request._post_last_modified = timezone.make_aware(updated_at) if updated_at else None
+    return request._post_last_modified
+
+
+def get_post_etag(request, pk):
+    last_modified = get_post_last_modified(request, pk)
+    if last_modified is None:
+        return None
+    # 태그/카테고리/사이드바 변경은 updated_at에 안 남으므로 캐시 버전도 같이 넣음
+    # 로그인 사용자마다 수정 버튼, 댓글 폼이 다르므로 사용자도 구분
+    user = request.user.pk if request.user.is_authenticated else 'anonymous'
+    return f'{pk}-{last_modified.timestamp()}-{get_version_string(post_page_versions(request, pk=pk))}-{user}'
+
+
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(anonymous_page_cache(post_page_versions), name='dispatch')
+@method_decorator(condition(etag_func=get_post_etag, last_modified_func=get_post_last_modified), name='dispatch')
 class PostDetail(DetailView):
     # 특정 post의 category는 Category Class에서 관리하는게 아닌(->이렇게 되면 Category 하나에 여러개의 포스트 pk를 저장해야함), 각 Post에서 관리
     model = Post
 
+    def get_queryset(self):
+        return get_post_queryset()
+
     def get_context_data(self, **kwargs):
         context = super(PostDetail, self).get_context_data()
-        context['categories'] = Category.objects.all()
-        context['no_category_post_count'] = Post.objects.filter(category=None).count()
+        comments = get_comment_page(self.object.pk, self.request.GET.get('comments_before'))
+        prefetch_avatar_urls([self.object.author] + [comment.author for comment in comments])
+        context['comments'] = comments
         context['comment_form'] = CommentForm
 
         return context
@@ -78,19 +130,7 @@ class PostCreate(LoginRequiredMixin, UserPassesTestMixin, CreateView):
             response = super(PostCreate, self).form_valid(form) # Post에 pk를 부여해서 db에 저장해놓기 위해 먼저 실행
 
             tags_str = self.request.POST.get('tags_str') # POST로 전달된 정보 중 name='tags_str'인 input값을 가져옴 
-            if tags_str:
-                tags_str = tags_str.strip()
-
-                tags_str = tags_str.replace(',', ';')
-                tags_list = tags_str.split(';')
-
-                for t in tags_list:
-                    t = t.strip()
-                    tag, is_tag_created = Tag.objects.get_or_create(name=t)
-                    if is_tag_created:
-                        tag.slug = slugify(t, allow_unicode=True)
-                        tag.save()
-                    self.object.tags.add(tag)
+            sync_post_tags(self.object, tags_str)
 
             return response  # 새로 만든 포스트의 페이지로 redirect
         else:
@@ -100,19 +140,14 @@ class PostCreate(LoginRequiredMixin, UserPassesTestMixin, CreateView):
 class PostUpdate(LoginRequiredMixin, UpdateView):
     # UserPassesTestMixin 안하는 이유? -> 권한이 아니라 그냥 본인이어야함! 그래서 dispatch 사용
     model = Post
-    fields = ['title', 'hook_text', 'content', 'head_image', 'file_upload', 'category', 'tags']
+    fields = ['title', 'hook_text', 'content', 'head_image', 'file_upload', 'category']
+    # tags: PostCreate처럼 tags_str로 입력받음 (form에 두면 저장할 때 태그가 먼저 비워짐)
 
     template_name = 'blog/post_update_form.html'
 
     def get_context_data(self, **kwargs):
         context = super(PostUpdate, self).get_context_data()
-        # print('update ' + str(self.object.tags.exists()))
-        if self.object.tags.exists():
-            # print(self.object.tags.all())
-            tags_str_list = list()
-            for t in self.object.tags.all():
-                tags_str_list.append(t.name)
-            context['tags_str_default'] = '; '.join(tags_str_list)
+        context['tags_str_default'] = '; '.join(self.object.tags.values_list('name', flat=True))
 
         return context
 
@@ -126,21 +161,8 @@ class PostUpdate(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         response = super(PostUpdate, self).form_valid(form)
-        self.object.tags.clear()
-
-        tags_str = self.request.POST.get('tags_str')
-        if tags_str:
-            tags_str = tags_str.strip()
-            tags_str = tags_str.replace(',', ';')
-            tags_list = tags_str.split(';')
-
-            for t in tags_list:
-                t = t.strip()
-                tag, is_tag_created = Tag.objects.get_or_create(name=t)
-                if is_tag_created:
-                    tag.slug = slugify(t, allow_unicode=True)
-                    tag.save()
-                self.object.tags.add(tag)
+        # clear() 후 다시 add하지 않고, 바뀐 태그만 반영
+        sync_post_tags(self.object, self.request.POST.get('tags_str'))
 
         return response
 
@@ -155,42 +177,69 @@ class CommentUpdate(LoginRequiredMixin, UpdateView):
         else:
             raise PermissionDenied
 
+@read_from_replica
+@anonymous_page_cache(list_page_versions)
 def category_page(request, slug):
     if slug == 'no_category':
         category = '미분류'
-        post_list = Post.objects.filter(category=None)
+        post_list = get_post_queryset().filter(category=None)
     else:
         category = Category.objects.get(slug=slug)
-        post_list = Post.objects.filter(category=category)
+        post_list = get_post_queryset().filter(category=category)
 
     return render(
         request,
         'blog/post_list.html',
         {
-            'post_list': post_list,
-            'categories': Category.objects.all(),
-            'no_category_post_count': Post.objects.filter(category=None).count(),
             'category': category,
+            **paginate_post_list(request, post_list, PostList.paginate_by),
         }
     )
 
+@read_from_replica
+@anonymous_page_cache(list_page_versions)
 def tag_page(request, slug):
     tag = Tag.objects.get(slug=slug)
-    post_list = tag.post_set.all()
-    # post_list = Post.objects.filter(tags=tag)
+    # post_list = tag.post_set.all()
+    post_list = get_post_queryset().filter(tags=tag)
 
     return render(
         request,
         'blog/post_list.html',
         {
-            'post_list': post_list,
-            'categories': Category.objects.all(),
-            'no_category_post_count': Post.objects.filter(category=None).count(),
             'tag': tag,
+            **paginate_post_list(request, post_list, PostList.paginate_by),
         }
     )
 
 
+# ASGI(uvicorn)에서 쓰는 async view. settings.BLOG_ASYNC_VIEWS가 켜져 있으면 urls.py에서 sync view 대신 연결됨
+post_list_async = async_cached_view(PostList.as_view(), list_page_versions)
+post_detail_async = async_cached_view(PostDetail.as_view(), post_page_versions)
+category_page_async = async_cached_view(category_page, list_page_versions)
+tag_page_async = async_cached_view(tag_page, list_page_versions)
+
+
+def get_comment_page(post_pk, before):
+    # 최근 댓글부터 한 페이지. 작성자는 select_related, 아바타는 prefetch_avatar_urls로 한번에
+    return paginate_comments(
+        Comment.objects.filter(post_id=post_pk).select_related('author'),
+        before,
+        getattr(settings, 'BLOG_COMMENTS_PER_PAGE', 20),
+    )
+
+
+@read_from_replica
+@anonymous_page_cache(comment_page_versions)
+def comment_list(request, pk):
+    # "이전 댓글" 버튼이 부르는 fragment: ?before=<cursor>보다 오래된 댓글 HTML과 그 다음 cursor
+    post = get_object_or_404(Post.objects.only('pk'), pk=pk)
+    comments = get_comment_page(pk, request.GET.get('before'))
+    prefetch_avatar_urls([comment.author for comment in comments])
+    html = render_to_string('blog/comment_list.html', {'post': post, 'comments': comments}, request=request)
+    return JsonResponse({'html': html, 'count': len(comments), 'next': comments.next_cursor})
+
+
 def new_comment(request, pk):
     if request.user.is_authenticated:
         post = get_object_or_404(Post, pk=pk)
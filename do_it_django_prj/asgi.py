@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from .startup import boot
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'do_it_django_prj.settings')
+# 운영 설정이 기본. 개발 서버(manage.py runserver)는 manage.py가 정한 dev 설정을 씀
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'do_it_django_prj.settings.prod')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
-application = get_asgi_application()
+# django.setup()과 URLconf, 템플릿을 worker가 요청을 받기 전에 준비하고 걸린 시간을 확인 (startup.py)
+application = boot('django.core.asgi.get_asgi_application')
@@ -0,0 +1,131 @@
+# 환경 변수로 만드는 DB 설정과 replica routing.
+# database_config(): 기본은 sqlite, DJANGO_DB_ENGINE=postgresql이면 PostgreSQL. DJANGO_DB_REPLICAS의 host마다 replica_<n> alias
+# PrimaryReplicaRouter: read_from_replica가 붙은 view 안에서만 읽기를 replica로 보내고, 쓰고 나면 요청의 나머지와
+#   (쿠키로) 몇 초 동안의 다음 요청은 primary에서 읽음
+# tune_sqlite: SQLITE_TUNING이 켜져 있으면 새 sqlite connection마다 SQLITE_PRAGMAS를 적용
+import os
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_PREFIX = 'replica_'
+PIN_COOKIE = 'db_pin_primary'
+
+
+def database_config(environ=os.environ, sqlite_path='db.sqlite3'):
+    engine = environ.get('DJANGO_DB_ENGINE', 'sqlite')
+    if engine == 'postgresql':
+        default = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': environ.get('POSTGRES_DB', 'do_it_django'),
+            'USER': environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': environ.get('POSTGRES_PORT', '5432'),
+            # 요청마다 새로 접속하지 않고 worker가 connection을 재사용
+            'CONN_MAX_AGE': int(environ.get('DJANGO_DB_CONN_MAX_AGE', 60)),
+            # 켜면 한동안 쉬었던 connection을 재사용하기 전에 죽었는지 확인 (DatabaseMiddleware에서 처리)
+            'CONN_HEALTH_CHECKS': environ.get('DJANGO_DB_HEALTH_CHECKS', '0') == '1',
+            'OPTIONS': {
+                'connect_timeout': int(environ.get('POSTGRES_CONNECT_TIMEOUT', 5)),
+            },
+        }
+        if environ.get('DJANGO_DB_POOLER') == 'pgbouncer':
+            # pgbouncer transaction pooling에서는 transaction마다 서버 connection이 바뀌므로
+            # server-side cursor(QuerySet.iterator())를 쓸 수 없음
+            default['DISABLE_SERVER_SIDE_CURSORS'] = True
+    else:
+        default = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': environ.get('SQLITE_PATH', sqlite_path),
+        }
+
+    databases = {DEFAULT_DB_ALIAS: default}
+    replicas = [host.strip() for host in environ.get('DJANGO_DB_REPLICAS', '').split(',') if host.strip()]
+    for i, host in enumerate(replicas):
+        replica = dict(default)
+        if engine == 'postgresql':
+            replica['HOST'], _, port = host.partition(':')
+            replica['PORT'] = port or default['PORT']
+        # sqlite는 같은 파일을 가리키는 alias가 됨 (로컬에서 router를 확인하는 용도)
+        # 테스트에서는 replica용 DB를 따로 만들지 않고 default를 봄
+        replica['TEST'] = {'MIRROR': DEFAULT_DB_ALIAS}
+        databases[f'{REPLICA_PREFIX}{i}'] = replica
+    return databases
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+class RoutingState:
+    # 요청 하나의 routing 상태. router와 DatabaseMiddleware가 같이 씀
+
+    def __init__(self, pinned=False):
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+
+
+current_state = ContextVar('db_routing_state', default=None)
+
+
+def read_from_replica(view_func):
+    # 이 view(와 그 템플릿 렌더링)의 읽기는 replica로 보냄. GET/HEAD만
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        state = current_state.get()
+        if state is not None and request.method in ('GET', 'HEAD'):
+            state.use_replica = True
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if self.replicas and state is not None and state.use_replica and not state.pinned:
+            return random.choice(self.replicas)
+        # None을 돌려주면 replica에서 읽은 instance의 related 조회가 replica로 감
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            # 쓰고 나면 이 요청의 나머지 읽기는 primary에서 (replication lag)
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 primary와 같은 데이터
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in self.replicas
+
+
+# 한 대짜리 서버에서 sqlite를 그대로 쓸 때 (settings.SQLITE_TUNING)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',  # 읽기가 쓰기(new_comment, PostCreate)를 기다리지 않음
+    'synchronous': 'normal',  # WAL에서는 NORMAL이어도 DB가 깨지지 않음. 정전 시 마지막 commit 몇 개만 잃을 수 있음
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # 음수는 KiB 단위 -> 64MB
+    'busy_timeout': 5000,  # ms. lock이 걸려 있으면 바로 에러를 내지 않고 기다림
+}
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    # connection_created 신호 처리. connection마다 한번씩 pragma를 적용
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    for name, value in SQLITE_PRAGMAS.items():
+        if name == 'journal_mode' and connection.is_in_memory_db():
+            continue  # in-memory DB(테스트)에는 WAL이 없음
+        # cursor wrapper(쿼리 로그, PerformanceMiddleware)를 거치지 않도록 sqlite connection에 직접 실행
+        connection.connection.execute(f'PRAGMA {name} = {value}')
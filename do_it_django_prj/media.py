@@ -0,0 +1,204 @@
+# 업로드된 파일(MEDIA_ROOT) 보내기: head image, 그 derivative, Post.file_upload 첨부 파일.
+# serve_media는 조건부 요청(ETag / Last-Modified)을 직접 처리하고, settings.MEDIA_ACCEL이 있으면 파일은 앞단
+# proxy에 넘김 (nginx는 X-Accel-Redirect, Apache/lighttpd는 X-Sendfile) -> 느린 다운로드가 python worker를 잡고 있지 않음.
+# 없으면 Django가 직접 stream함 (Range는 한 구간만 지원).
+# SendfileProxy는 그 앞단 proxy 역할을 하는 WSGI middleware (nginx 없이 gunicorn을 띄울 때, 테스트)
+import mimetypes
+import os
+import re
+from urllib.parse import quote, unquote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+ACCEL_REDIRECT = 'x-accel-redirect'
+SENDFILE = 'x-sendfile'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# 첨부파일은 브라우저에서 열지 않고 내려받게 함
+ATTACHMENT_DIRS = ('blog/files/',)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(stat):
+    # nginx와 같은 방식 (수정 시각-크기). 내용을 읽지 않고 만들 수 있음
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    # bytes= 한 구간의 (start, end) (end 포함). 헤더를 무시하고 전체를 보내야 하면 None
+    # 여러 구간(multipart/byteranges)은 지원하지 않음 -> 전체를 보냄
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size:
+            raise RangeNotSatisfiable
+        if end < start:
+            return None
+    else:
+        # bytes=-500: 마지막 500 bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiable
+        start, end = max(0, size - int(last)), size - 1
+    return start, end
+
+
+class FileSlice:
+    # FileResponse가 start부터 length bytes만 읽도록 감싼 파일.
+    # fileno가 없으므로 gunicorn도 sendfile()로 파일 끝까지 보내지 않고 read()로 읽음
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.file = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def media_path(path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:  # MEDIA_ROOT 밖 (../)
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path
+
+
+def base_response(response, path, stat):
+    # 원본 응답과 proxy로 넘기는 응답에 똑같이 붙는 헤더
+    response['ETag'] = file_etag(stat)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    response['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if path.startswith(ATTACHMENT_DIRS):
+        filename = os.path.basename(path)
+        response['Content-Disposition'] = f"attachment; filename*=utf-8''{quote(filename)}"
+    return response
+
+
+def if_range_matches(request, stat):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == file_etag(stat)
+    return parse_http_date_safe(if_range) == int(stat.st_mtime)
+
+
+def file_response(request, path, full_path):
+    # full_path를 stream으로 보냄 (Range/If-Range 지원)
+    stat = os.stat(full_path)
+    byte_range = None
+    if request.META.get('HTTP_RANGE') and if_range_matches(request, stat):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    f = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(f)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileSlice(f, start, end - start + 1), status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    return base_response(response, path, stat)
+
+
+def serve_media(request, path):
+    full_path = media_path(path)
+    stat = os.stat(full_path)
+    # 304는 proxy까지 가지 않고 여기서 바로
+    not_modified = get_conditional_response(request, etag=file_etag(stat), last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        not_modified['ETag'] = file_etag(stat)
+        return not_modified
+
+    accel = getattr(settings, 'MEDIA_ACCEL', '')
+    if accel == ACCEL_REDIRECT:
+        # nginx: location <MEDIA_ACCEL_PREFIX> { internal; alias <MEDIA_ROOT>/; }
+        # Range, 전송은 nginx가 처리하고 worker는 바로 다음 요청을 받음
+        response = base_response(HttpResponse(), path, stat)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return response
+    if accel == SENDFILE:
+        response = base_response(HttpResponse(), path, stat)
+        response['X-Sendfile'] = full_path
+        return response
+    return file_response(request, path, full_path)
+
+
+class SendfileProxy:
+    # nginx/Apache가 offload 헤더를 받았을 때 하는 일을 하는 WSGI middleware.
+    # X-Accel-Redirect, X-Sendfile이 있는 응답을 파일 내용으로 바꿈 (원래 요청의 Range/If-Range를 따르고,
+    # Content-Type, Content-Disposition, Cache-Control은 그대로 둠)
+
+    PASS_HEADERS = ('Content-Type', 'Content-Disposition', 'Cache-Control')
+
+    def __init__(self, application):
+        self.application = application
+
+    def __call__(self, environ, start_response):
+        upstream = {}
+
+        def capture(status, headers, exc_info=None):
+            upstream['status'], upstream['headers'] = status, headers
+            return lambda data: None
+
+        body = self.application(environ, capture)
+        headers = dict(upstream['headers'])
+        try:
+            full_path = self.resolve(headers)
+        except Http404:
+            full_path = ''
+        if full_path is None:
+            start_response(upstream['status'], upstream['headers'])
+            return body
+        if hasattr(body, 'close'):
+            body.close()
+        if not os.path.isfile(full_path):
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+
+        path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response = file_response(WSGIRequest(environ), path, full_path)
+        for name in self.PASS_HEADERS:
+            if name in headers:
+                response[name] = headers[name]
+        status = f'{response.status_code} {response.reason_phrase}'
+        start_response(status, list(response.items()))
+        return response
+
+    def resolve(self, headers):
+        if 'X-Accel-Redirect' in headers:
+            location = unquote(headers['X-Accel-Redirect'])
+            if location.startswith(settings.MEDIA_ACCEL_PREFIX):
+                return media_path(location[len(settings.MEDIA_ACCEL_PREFIX):])
+        if 'X-Sendfile' in headers:
+            return headers['X-Sendfile']
+        return None
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import db, perf
+
+
+class AsyncCapableMiddleware:
+    # ASGI에서 async view까지 thread를 거치지 않고 가도록 sync/async 양쪽을 지원
+    # (django.utils.deprecation.MiddlewareMixin과 같은 방식)
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.process(request)
+
+    async def __acall__(self, request):
+        return await self.aprocess(request)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    # 요청마다 SQL 수/시간, 템플릿 시간, 전체 시간을 재서 Server-Timing 헤더로 보내고
+    # view 이름별로 모음 (manage.py perf_report)
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        super(PerformanceMiddleware, self).__init__(get_response)
+        perf.install_sql_timer()
+
+    def process(self, request):
+        stats = perf.RequestStats()
+        token = perf.current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.current_request.reset(token)
+        return self.record(request, response, stats, start)
+
+    async def aprocess(self, request):
+        stats = perf.RequestStats()
+        token = perf.current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.current_request.reset(token)
+        return self.record(request, response, stats, start)
+
+    def record(self, request, response, stats, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        sql_ms = stats.sql_time * 1000
+        template_ms = stats.template_time * 1000
+
+        fragments = stats.fragment_hits + stats.fragment_misses
+        response['Server-Timing'] = (
+            f'sql;dur={sql_ms:.1f};desc="{stats.sql_count} queries", '
+            f'tpl;dur={template_ms:.1f}, '
+            + (f'frag;desc="{stats.fragment_hits}/{fragments} hits", ' if fragments else '')
+            + f'total;dur={total_ms:.1f}'
+        )
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        perf.histogram.record(
+            view_name, total_ms, stats.sql_count, sql_ms, template_ms, stats.fragment_hits, stats.fragment_misses,
+        )
+        return response
+
+
+class DatabaseMiddleware(AsyncCapableMiddleware):
+    # 재사용하는 connection 확인과 replica routing.
+    # Django 3.2에는 CONN_HEALTH_CHECKS가 없으므로, 그 설정을 켠 DB는 요청 시작 전에 확인하고 죽었으면 닫아서
+    # 첫 쿼리에서 실패하지 않고 다시 접속하게 함. 확인은 DB 왕복 한번이라 DATABASE_HEALTH_CHECK_IDLE_SECONDS보다
+    # 오래 쉬었던 connection만 확인함 (방금 쓴 connection은 살아 있다고 봄)
+
+    def __init__(self, get_response):
+        self.replicas = db.replica_aliases()
+        self.health_checks = [
+            alias for alias, settings_dict in settings.DATABASES.items()
+            if settings_dict.get('CONN_HEALTH_CHECKS') and settings_dict.get('CONN_MAX_AGE')
+        ]
+        if not self.replicas and not self.health_checks:
+            raise MiddlewareNotUsed
+        super(DatabaseMiddleware, self).__init__(get_response)
+        self.pin_seconds = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+        self.idle_seconds = getattr(settings, 'DATABASE_HEALTH_CHECK_IDLE_SECONDS', 30)
+
+    def check_connections(self):
+        now = time.monotonic()
+        for alias in self.health_checks:
+            connection = connections[alias]
+            if connection.connection is None:
+                continue
+            # connection은 thread마다 따로이므로 마지막으로 쓴 시각을 connection에 기억해둠
+            last_used = getattr(connection, 'health_check_last_used', None)
+            if (last_used is None or now - last_used > self.idle_seconds) and not connection.is_usable():
+                connection.close()
+
+    def mark_connections_used(self):
+        now = time.monotonic()
+        for alias in self.health_checks:
+            connections[alias].health_check_last_used = now
+
+    def process(self, request):
+        self.check_connections()
+        state = db.RoutingState(pinned=db.PIN_COOKIE in request.COOKIES)
+        token = db.current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db.current_state.reset(token)
+            self.mark_connections_used()
+        return self.pin(response, state)
+
+    async def aprocess(self, request):
+        # connection은 thread별이고 ORM은 sync_to_async thread에서 돌기 때문에 여기서는 health check를 하지 않음
+        state = db.RoutingState(pinned=db.PIN_COOKIE in request.COOKIES)
+        token = db.current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db.current_state.reset(token)
+        return self.pin(response, state)
+
+    def pin(self, response, state):
+        if state.wrote and self.replicas:
+            # replica가 따라잡을 동안 이 브라우저의 다음 요청도 primary에서 읽음
+            response.set_cookie(db.PIN_COOKIE, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware, WhiteNoiseMiddleware):
+    # STATIC_ROOT(manage.py collectstatic)을 WhiteNoise로 보냄.
+    # BlogStaticFilesStorage가 만든 hash 이름 파일은 immutable로 오래 캐시하고, 미리 압축한 .br/.gz 중
+    # 클라이언트가 받는 것을 보냄. WhiteNoiseMiddleware와 달리 ASGI에서도 thread를 거치지 않음
+
+    def __init__(self, get_response):
+        if not os.path.isdir(settings.STATIC_ROOT or ''):
+            # collectstatic 전 (개발에서는 runserver가 앱의 static 폴더에서 보냄)
+            raise MiddlewareNotUsed
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        super(StaticFilesMiddleware, self).__init__(get_response)
+
+    def find_static_file(self, request):
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    def process(self, request):
+        static_file = self.find_static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    async def aprocess(self, request):
+        static_file = self.find_static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,198 @@
+# view별 요청 통계 (SQL 수/시간, 템플릿 시간, 조각 캐시 적중/실패, 전체 시간).
+# PerformanceMiddleware가 요청마다 process 안의 histogram에 기록하고, worker마다 가끔
+# PERF_STATS_DIR/<pid>.json으로 써둠. manage.py perf_report가 파일들을 합쳐서 보여줌
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+# 총 응답 시간(ms) histogram의 bucket 경계
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+current_request = ContextVar('perf_current_request', default=None)
+
+
+def get_stats_dir():
+    return getattr(settings, 'PERF_STATS_DIR', os.path.join(tempfile.gettempdir(), 'do_it_django_perf'))
+
+
+class RequestStats:
+    __slots__ = ('sql_count', 'sql_time', 'template_time', 'fragment_hits', 'fragment_misses')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        # {% post_fragment %} (blog/templatetags/blog_cache.py)
+        self.fragment_hits = 0
+        self.fragment_misses = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+
+def new_view_stats():
+    return {
+        'count': 0,
+        'total_ms': 0.0,
+        'sql_count': 0,
+        'sql_ms': 0.0,
+        'template_ms': 0.0,
+        'fragment_hits': 0,
+        'fragment_misses': 0,
+        'buckets': [0] * len(BUCKETS_MS),
+    }
+
+
+SUMMED_KEYS = ('count', 'total_ms', 'sql_count', 'sql_ms', 'template_ms', 'fragment_hits', 'fragment_misses')
+
+
+class Histogram:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, total_ms, sql_count, sql_ms, template_ms, fragment_hits=0, fragment_misses=0):
+        with self.lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = new_view_stats()
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['sql_count'] += sql_count
+            stats['sql_ms'] += sql_ms
+            stats['template_ms'] += template_ms
+            stats['fragment_hits'] += fragment_hits
+            stats['fragment_misses'] += fragment_misses
+            for i, bound in enumerate(BUCKETS_MS):
+                if total_ms <= bound:
+                    stats['buckets'][i] += 1
+                    break
+
+            if time.monotonic() - self.last_flush < getattr(settings, 'PERF_FLUSH_INTERVAL', 10):
+                return
+            self.last_flush = time.monotonic()
+            snapshot = self.snapshot()
+        # 파일 쓰기는 lock 밖에서 (다른 thread의 record를 막지 않음)
+        self.flush(snapshot)
+
+    def snapshot(self):
+        # lock을 잡은 상태에서 호출
+        return {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self.views.items()}
+
+    def flush(self, snapshot=None):
+        if snapshot is None:
+            with self.lock:
+                snapshot = self.snapshot()
+        stats_dir = get_stats_dir()
+        os.makedirs(stats_dir, exist_ok=True)
+        path = os.path.join(stats_dir, f'{os.getpid()}.json')
+        # 여러 thread가 동시에 쓸 수 있으므로 임시 파일은 thread마다 따로
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+
+histogram = Histogram()
+
+
+def load_stats(stats_dir=None):
+    # 모든 worker의 histogram 파일을 합침
+    stats_dir = stats_dir or get_stats_dir()
+    merged = {}
+    if not os.path.isdir(stats_dir):
+        return merged
+    for name in os.listdir(stats_dir):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(stats_dir, name)) as f:
+            views = json.load(f)
+        for view_name, stats in views.items():
+            total = merged.setdefault(view_name, new_view_stats())
+            for key in SUMMED_KEYS:
+                total[key] += stats.get(key, 0)  # 예전 버전이 쓴 파일에는 fragment_* 가 없음
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+    return merged
+
+
+def percentile(buckets, q):
+    # bucket 경계로 근사한 q 분위수(ms)
+    count = sum(buckets)
+    if not count:
+        return 0
+    rank = q * count
+    seen = 0
+    for bound, n in zip(BUCKETS_MS, buckets):
+        seen += n
+        if seen >= rank:
+            return bound
+    return BUCKETS_MS[-1]
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current_request.get()
+        if stats is None:
+            return super(TimedTemplate, self).render(context, request)
+        start = time.perf_counter()
+        try:
+            return super(TimedTemplate, self).render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # TEMPLATES의 BACKEND. 현재 요청의 template 로딩+렌더링 시간을 RequestStats에 더함
+    # (extends/include 등 안쪽 템플릿은 backend를 거치지 않으므로 최상위 템플릿만 한번씩 잡힘.
+    #  안쪽 템플릿을 읽고 파싱하는 시간은 render 안에 들어감)
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        stats = current_request.get()
+        start = time.perf_counter()
+        try:
+            return TimedTemplate(super(TimedDjangoTemplates, self).get_template(template_name).template, self)
+        finally:
+            if stats is not None:
+                stats.template_time += time.perf_counter() - start
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.sql_wrapper(execute, sql, params, many, context)
+
+
+def _add_sql_wrapper(connection):
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _add_sql_wrapper(connection)
+
+
+def install_sql_timer():
+    # connection마다 wrapper를 한번 걸어두고, 요청 중인지는 current_request로 판단.
+    # ASGI에서는 ORM이 sync_to_async thread의 connection을 쓰므로 middleware에서 execute_wrapper를 걸 수 없음
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_on_connection_created, dispatch_uid='perf_sql_timer')
+    for connection in connections.all():
+        _add_sql_wrapper(connection)
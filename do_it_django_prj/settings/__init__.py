@@ -0,0 +1,4 @@
+# 설정 package
+# base: 모든 환경에서 같이 쓰는 설정
+# dev: DEBUG, 개발용 app, 템플릿 캐시 끔 (manage.py 기본값)
+# prod: 비밀 키와 host는 환경 변수에서, 개발용 app 없음 (wsgi.py, asgi.py 기본값)
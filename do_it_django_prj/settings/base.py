@@ -0,0 +1,229 @@
+"""
+Django settings for do_it_django_prj project.
+
+Generated by 'django-admin startproject' using Django 3.1.5.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/3.1/ref/settings/
+"""
+
+# 모든 환경에서 같이 쓰는 설정. 직접 쓰지 않고 dev.py(manage.py), prod.py(wsgi.py, asgi.py)에서 import *
+
+import os
+from pathlib import Path
+
+from ..db import database_config
+from ..templates import template_loaders
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# SECRET_KEY, ALLOWED_HOSTS는 dev.py / prod.py에서 정함
+# See https://docs.djangoproject.com/en/3.1/howto/deployment/checklist/
+
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+
+    'crispy_forms',
+    'markdownx',
+    'django.contrib.sites',
+    'allauth',
+    'allauth.account',
+    'allauth.socialaccount',
+    'allauth.socialaccount.providers.google',
+
+    'blog',
+    'single_pages',
+]
+
+MIDDLEWARE = [
+    'do_it_django_prj.middleware.PerformanceMiddleware',
+    'do_it_django_prj.middleware.DatabaseMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'do_it_django_prj.middleware.StaticFilesMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# PerformanceMiddleware: 요청마다 SQL 수/시간, 템플릿 렌더링 시간을 Server-Timing 헤더로 보내고
+# view별 histogram을 PERF_STATS_DIR에 모음 (manage.py perf_report로 확인)
+PERF_INSTRUMENTATION = True
+PERF_FLUSH_INTERVAL = 10  # seconds
+
+ROOT_URLCONF = 'do_it_django_prj.urls'
+
+# cached loader로 템플릿을 process마다 한번만 읽고 파싱함.
+# wsgi.py/asgi.py가 worker를 띄울 때 blog, single_pages 템플릿을 미리 컴파일해 둠 (do_it_django_prj/templates.py)
+# 개발(dev.py)에서는 템플릿을 고치면 바로 보이도록 끔. manage.py bench_templates로 켜고 끈 결과를 비교할 수 있음
+TEMPLATE_CACHE = os.environ.get('DJANGO_TEMPLATE_CACHE', '1') == '1'
+
+TEMPLATES = [
+    {
+        # DjangoTemplates + 요청별 템플릿 시간 측정 (PerformanceMiddleware의 Server-Timing tpl)
+        'BACKEND': 'do_it_django_prj.perf.TimedDjangoTemplates',
+        'NAME': 'django',
+        'DIRS': [],
+        'OPTIONS': {
+            'loaders': template_loaders(TEMPLATE_CACHE),
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.sidebar',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'do_it_django_prj.wsgi.application'
+
+# worker 시작(wsgi.py/asgi.py의 startup.boot: django.setup, URLconf import, 템플릿 예열)에 걸려도 되는 시간.
+# 넘으면 가장 느린 app들을 stderr에 찍음. manage.py startup_report로 새 process에서 측정할 수 있음
+STARTUP_BUDGET_MS = int(os.environ.get('DJANGO_STARTUP_BUDGET_MS', '1000'))
+
+
+# Database
+# https://docs.djangoproject.com/en/3.1/ref/settings/#databases
+# 기본은 sqlite. 운영에서는 환경 변수로 PostgreSQL을 씀 (do_it_django_prj/db.py):
+#   DJANGO_DB_ENGINE=postgresql POSTGRES_DB POSTGRES_USER POSTGRES_PASSWORD POSTGRES_HOST POSTGRES_PORT
+#   DJANGO_DB_CONN_MAX_AGE (기본 60초), DJANGO_DB_HEALTH_CHECKS (기본 0)
+#   DJANGO_DB_POOLER=pgbouncer: POSTGRES_HOST/PORT를 pgbouncer로 두고 server-side cursor를 끔
+#   DJANGO_DB_REPLICAS=host1,host2:5433: read_from_replica view들의 읽기를 replica로 보냄
+#     (sqlite에서는 같은 파일을 가리키는 alias가 만들어짐)
+
+DATABASES = database_config(sqlite_path=BASE_DIR / 'db.sqlite3')
+DATABASE_ROUTERS = ['do_it_django_prj.db.PrimaryReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = 5  # 쓰기 후 이 시간 동안은 같은 브라우저의 읽기도 primary로
+
+# sqlite로 운영할 때 connection마다 WAL, mmap 등을 켬 (do_it_django_prj.db.SQLITE_PRAGMAS)
+# manage.py bench_sqlite_concurrency로 켜고 끈 결과를 비교할 수 있음
+SQLITE_TUNING = os.environ.get('DJANGO_SQLITE_TUNING', '0') == '1'
+
+
+# Cache
+# 페이지/사이드바 캐시의 무효화는 모든 worker가 같은 캐시를 볼 때만 맞으므로,
+# worker가 여러 개면 memcached 같은 공유 캐시로 바꿔야 함
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
+BLOG_PAGE_CACHE = True
+# 포스트 상세에서 한번에 보여주는 댓글 수 (나머지는 "이전 댓글"로 불러옴)
+BLOG_COMMENTS_PER_PAGE = 20
+# ASGI로 띄우면(asgi.py) 읽기 페이지들을 async view로 연결. 캐시된 익명 페이지는 thread를 거치지 않고 응답함
+BLOG_ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', '0') == '1'
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+# 포스트 카드/본문 HTML 조각 캐시 ({% post_fragment %}). 로그인 사용자에게도 적용됨
+BLOG_FRAGMENT_CACHE = True
+BLOG_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+# 포스트 저장 후의 무거운 일(검색 인덱스, 이미지 derivative, 캐시 예열)은 blog.tasks의 작업 큐로 보냄.
+# BLOG_TASKS_EAGER는 dev.py(켬: 요청 안에서 바로 실행), prod.py(끔: manage.py run_tasks worker가 실행)에서 정함.
+# 캐시 예열은 worker가 채운 캐시를 웹 worker도 읽을 수 있을 때(공유 캐시)만 의미가 있음.
+# LocMemCache는 process마다 따로라 worker가 자기 메모리만 채우게 됨
+CACHE_IS_SHARED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.1/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'Asia/Seoul'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = False
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.1/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', os.path.join(BASE_DIR, '_static'))
+
+# 운영: DJANGO_STATIC_MANIFEST=1로 collectstatic을 하면 파일 이름에 내용 해시가 붙고(bootstrap.min.<hash>.css)
+# .gz/.br 파일이 미리 만들어짐. StaticFilesMiddleware(WhiteNoise)가 STATIC_ROOT에서 바로 보내고,
+# 해시가 붙은 파일은 내용이 바뀌면 이름도 바뀌므로 1년짜리 immutable 캐시를 붙임.
+# (manifest가 없으면 {% static %}이 에러를 내므로 collectstatic 전에는 켜지 않음)
+if os.environ.get('DJANGO_STATIC_MANIFEST', '0') == '1':
+    STATICFILES_STORAGE = 'do_it_django_prj.staticfiles.BlogStaticFilesStorage'
+# collectstatic 때 템플릿/코드에 나오지 않는 class의 규칙을 지울 CSS 파일 (BlogStaticFilesStorage)
+STATIC_CSS_PURGE = ['blog/bootstrap/bootstrap.min.css'] if os.environ.get('DJANGO_CSS_PURGE', '0') == '1' else []
+# 템플릿 변수로 조합해서 쓰는 class처럼 소스에 그대로 나오지 않는 것
+STATIC_CSS_PURGE_SAFELIST = []
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, '_media')
+# 업로드 파일(do_it_django_prj.media.serve_media)을 앞단 서버가 보내게 함:
+# '' = Django이 직접 보냄, 'x-accel-redirect' = nginx, 'x-sendfile' = Apache(mod_xsendfile), lighttpd
+MEDIA_ACCEL = os.environ.get('DJANGO_MEDIA_ACCEL', '')
+# nginx의 internal location. location /_media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_ACCEL_PREFIX = os.environ.get('DJANGO_MEDIA_ACCEL_PREFIX', '/_media/')
+# 업로드 파일 이름은 해시가 없으므로 짧게 캐시하고 ETag로 다시 확인
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+CRISPY_TEMPLATE_PACK = 'bootstrap4'
+
+AUTHENTICATION_BACKENDS = (
+    'django.contrib.auth.backends.ModelBackend',
+
+    'allauth.account.auth_backends.AuthenticationBackend',
+)
+
+SITE_ID = 1
+
+ACCOUNT_EMAIL_REQUIRED = True
+ACCOUNT_EMAIL_VERIFICATION = 'none'
+LOGIN_REDIRECT_URL = '/blog/'
+
@@ -0,0 +1,27 @@
+# 개발 설정: manage.py runserver, 테스트, 벤치마크
+from .base import *  # noqa: F401,F403
+from .base import CACHE_IS_SHARED, INSTALLED_APPS, TEMPLATES, os, template_loaders
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'j(v68_@mm#h)2_^2uq2k&y2k#=4o9ef7y3i^(@8zht+slwpsj6'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+# 개발할 때만 쓰는 app (shell_plus 등). 운영 worker에는 올리지 않음
+DEV_APPS = [
+    'django_extensions',
+]
+INSTALLED_APPS = INSTALLED_APPS + DEV_APPS
+
+# 템플릿을 고치면 바로 보이도록 매번 읽음
+TEMPLATE_CACHE = os.environ.get('DJANGO_TEMPLATE_CACHE', '0') == '1'
+TEMPLATES = [
+    dict(TEMPLATES[0], OPTIONS=dict(TEMPLATES[0]['OPTIONS'], loaders=template_loaders(TEMPLATE_CACHE))),
+] + TEMPLATES[1:]
+
+# 작업 큐 없이 요청 안에서 바로 실행 (DJANGO_TASKS_EAGER=0이면 run_tasks로 확인할 수 있음)
+BLOG_TASKS_EAGER = os.environ.get('DJANGO_TASKS_EAGER', '1') == '1'
+BLOG_WARM_PAGE_CACHE = not BLOG_TASKS_EAGER and CACHE_IS_SHARED
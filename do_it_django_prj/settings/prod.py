@@ -0,0 +1,20 @@
+# 운영 설정 (gunicorn/uvicorn worker).
+# 환경 변수 DJANGO_SECRET_KEY, DJANGO_ALLOWED_HOSTS(쉼표로 구분)가 필요함.
+# 개발용 app은 INSTALLED_APPS에 없으므로 worker가 뜰 때 import하지 않음
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import CACHE_IS_SHARED, os
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Set DJANGO_SECRET_KEY to run with the production settings.')
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# 저장 후의 일은 manage.py run_tasks worker가 처리함 (worker 없이 띄울 때만 DJANGO_TASKS_EAGER=1)
+BLOG_TASKS_EAGER = os.environ.get('DJANGO_TASKS_EAGER', '0') == '1'
+BLOG_WARM_PAGE_CACHE = not BLOG_TASKS_EAGER and CACHE_IS_SHARED
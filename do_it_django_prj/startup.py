@@ -0,0 +1,101 @@
+# worker 시작: app별 import 시간과 시작 시간 예산.
+# wsgi.py/asgi.py는 application을 바로 만들지 않고 boot()을 부름. request handler를 import하고,
+# INSTALLED_APPS마다 시간을 재면서(app import, models, ready()) django.setup()을 하고, URLconf를 import하고
+# 템플릿을 미리 컴파일한 뒤 전체 시간을 settings.STARTUP_BUDGET_MS와 비교함.
+# 예산을 넘으면 가장 느린 app들을 stderr에 알려줄 뿐 worker를 멈추지는 않음.
+# manage.py startup_report가 새 process에서 같은 것을 재고, 예산을 넘으면 CI를 실패시킬 수 있음
+import sys
+import time
+from importlib import import_module
+
+# boot()이 채움. {app label: ms}, {단계: ms}, 전체 ms
+app_timings = {}
+phase_timings = {}
+boot_ms = None
+
+
+def timed_setup():
+    # django.setup()을 하면서 app label마다 AppConfig 만들기(app package import), models import,
+    # ready()에 걸린 ms를 기록해서 돌려줌
+    import django
+    from django.apps import AppConfig, apps
+
+    timings = {}
+    create = AppConfig.create.__func__
+
+    def timed(label, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings[label] += (time.perf_counter() - start) * 1000
+        return wrapper
+
+    def timed_create(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        timings[app_config.label] = (time.perf_counter() - start) * 1000
+        # populate()가 이 두 메서드를 app마다 부르므로 instance에 감싼 것을 잠깐 걸어둠
+        app_config.import_models = timed(app_config.label, app_config.import_models)
+        app_config.ready = timed(app_config.label, app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    try:
+        django.setup(set_prefix=False)
+    finally:
+        AppConfig.create = classmethod(create)
+        for app_config in apps.get_app_configs():
+            app_config.__dict__.pop('import_models', None)
+            app_config.__dict__.pop('ready', None)
+    return timings
+
+
+def slowest(timings, n=5):
+    return sorted(timings.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def check_budget(total_ms, timings, budget_ms, stream=None):
+    # 예산 안이면 True. 넘으면 가장 느린 app들을 알려주고 False
+    if not budget_ms or total_ms <= budget_ms:
+        return True
+    stream = stream or sys.stderr
+    apps = ', '.join(f'{label} {ms:.0f}ms' for label, ms in slowest(timings))
+    stream.write(f'startup took {total_ms:.0f}ms (budget {budget_ms}ms). slowest apps: {apps}\n')
+    return False
+
+
+def boot(get_application):
+    # get_application(예: 'django.core.wsgi.get_wsgi_application')이 돌려주는 application을 만들면서
+    # 단계별 시간을 재고 예산을 확인함
+    global boot_ms
+    from django.utils.module_loading import import_string
+
+    start = last = time.perf_counter()
+
+    def phase(name):
+        nonlocal last
+        now = time.perf_counter()
+        phase_timings[name] = (now - last) * 1000
+        last = now
+
+    get_application = import_string(get_application)  # django.core.handlers (request, response, urls ...)
+    phase('handler')
+    app_timings.update(timed_setup())
+    phase('setup')
+    application = get_application()
+    phase('application')  # middleware
+
+    # 첫 요청에서 하던 일을 fork 전에 해둠: URLconf(와 거기서 import되는 view들), 템플릿
+    from django.conf import settings
+    from .templates import warm_templates
+
+    import_module(settings.ROOT_URLCONF)
+    phase('urls')
+    warm_templates()
+    phase('templates')
+
+    boot_ms = (last - start) * 1000
+    check_budget(boot_ms, app_timings, getattr(settings, 'STARTUP_BUDGET_MS', None))
+    return application
@@ -0,0 +1,174 @@
+# 운영용 static 파일: hash가 붙은 이름, 미리 압축한 파일, 쓰지 않는 CSS 규칙 빼기 (선택).
+# BlogStaticFilesStorage는 WhiteNoise의 CompressedManifestStaticFilesStorage(collectstatic이 name.<hash>.ext와
+# .gz/.br 파일을 만듦)인데, 그 전에 settings.STATIC_CSS_PURGE의 stylesheet에서 class selector가 프로젝트의
+# 템플릿/소스 어디에도 없는 규칙을 뺌. hash는 뺀 뒤의 파일로 계산함
+import os
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.template.utils import get_app_template_dirs
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# bootstrap.js가 실행 중에 붙이는 class (템플릿에는 나오지 않음)
+DEFAULT_SAFELIST = (
+    'active', 'collapse', 'collapsing', 'disabled', 'dropdown-menu-right', 'fade', 'focus',
+    'modal-backdrop', 'modal-open', 'modal-scrollbar-measure', 'show', 'was-validated',
+    'is-invalid', 'is-valid', 'invalid-feedback', 'valid-feedback',
+)
+
+# 블록 안의 규칙을 다시 걸러야 하는 at-rule. 나머지(@font-face, @keyframes ...)는 그대로 둠
+NESTED_AT_RULES = ('@media', '@supports', '@document')
+
+CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+NOT_RE = re.compile(r':not\([^)]*\)')
+TOKEN_RE = re.compile(r'[\w-]+')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+SOURCE_SUFFIXES = ('.html', '.txt', '.py', '.js')
+
+
+def used_names(safelist=DEFAULT_SAFELIST):
+    # PurgeCSS처럼 템플릿과 프로젝트 코드에 나오는 단어를 모두 class 후보로 봄.
+    # 넉넉하게 남기는 쪽으로 틀리므로 템플릿 변수로 조합되는 class만 조심하면 됨 (STATIC_CSS_PURGE_SAFELIST)
+    roots = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+    roots += [Path(d) for d in get_app_template_dirs('templates')]
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path).resolve()
+        if base_dir in path.parents:
+            roots.append(path)  # 이 프로젝트의 app만. python/js 코드에서 붙이는 class
+
+    names = set(safelist)
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            if {'static', 'tests'} & set(Path(dirpath).relative_to(root).parts):
+                continue  # CSS 자신이나 vendor 파일, 테스트의 단어는 세지 않음
+            for filename in filenames:
+                if filename.endswith(SOURCE_SUFFIXES) and not filename.startswith('test'):
+                    with open(os.path.join(dirpath, filename), encoding='utf-8', errors='ignore') as f:
+                        names.update(TOKEN_RE.findall(f.read()))
+    return names
+
+
+def split_blocks(css):
+    # stylesheet를 최상위 (prelude, body) 쌍으로 나눔. body는 중괄호 안의 내용 (@charset 같은 문장은 None).
+    # 주석은 버리고, /*! ... */ 라이선스 주석만 body가 None인 prelude로 남김
+    blocks = []
+    i, start, n = 0, 0, len(css)
+    while i < n:
+        char = css[i]
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if css.startswith('/*!', i) and not css[start:i].strip():
+                blocks.append((css[i:end], None))
+                start = end
+            i = end
+        elif char in '"\'':
+            i = skip_string(css, i)
+        elif char == ';':
+            statement = COMMENT_RE.sub('', css[start:i]).strip()
+            if statement:
+                blocks.append((statement + ';', None))
+            i = start = i + 1
+        elif char == '{':
+            prelude = COMMENT_RE.sub('', css[start:i]).strip()
+            end = matching_brace(css, i)
+            blocks.append((prelude, css[i + 1:end]))
+            i = start = end + 1
+        else:
+            i += 1
+    return blocks
+
+
+def skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def matching_brace(css, i):
+    depth = 0
+    while i < len(css):
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end == -1 else end + 2
+            continue
+        char = css[i]
+        if char in '"\'':
+            i = skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def split_selectors(prelude):
+    # 쉼표로 나누되 :not(a, b)나 [attr="a,b"] 안의 쉼표는 무시
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def selector_used(selector, names):
+    # selector에 나오는 class가 모두 쓰이고 있어야 남김. :not(.x)의 class는 없어도 됨
+    return all(name in names for name in CLASS_RE.findall(NOT_RE.sub('', selector)))
+
+
+def purge_css(css, names):
+    out = []
+    for prelude, body in split_blocks(css):
+        if body is None:
+            out.append(prelude)
+        elif prelude.startswith('@'):
+            if prelude.split(None, 1)[0].lower() in NESTED_AT_RULES:
+                inner = purge_css(body, names)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            else:
+                out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in split_selectors(prelude) if selector_used(s, names)]
+            if selectors:
+                out.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(out)
+
+
+class BlogStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run and getattr(settings, 'STATIC_CSS_PURGE', None):
+            self.purge(paths)
+        yield from super(BlogStaticFilesStorage, self).post_process(paths, dry_run, **options)
+
+    def purge(self, paths):
+        names = used_names(DEFAULT_SAFELIST + tuple(getattr(settings, 'STATIC_CSS_PURGE_SAFELIST', ())))
+        for path in settings.STATIC_CSS_PURGE:
+            if path not in paths:
+                continue
+            source_storage, source_path = paths[path]
+            with source_storage.open(source_path) as f:
+                css = f.read().decode('utf-8')
+            # sourceMappingURL 주석도 같이 빠짐 (줄인 파일과 .map이 맞지 않음)
+            purged = purge_css(css, names)
+            self.delete(path)
+            self._save(path, ContentFile(purged.encode('utf-8')))
+            # 해시는 원본이 아니라 STATIC_ROOT에 다시 쓴 파일로 계산하도록
+            paths[path] = (self, path)
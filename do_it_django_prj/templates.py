@@ -0,0 +1,54 @@
+# 운영용 템플릿 로딩.
+# settings.TEMPLATE_CACHE이면 cached loader를 써서 템플릿(blog/base.html, navbar.html, footer.html ...)을
+# 요청마다가 아니라 process마다 한번만 읽고 컴파일함. wsgi.py/asgi.py가 worker를 띄울 때 warm_templates로
+# 미리 컴파일해 두므로 새 worker의 첫 요청이 그 시간을 쓰지 않음 (gunicorn --preload면 fork 전에 한번)
+from pathlib import Path
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# 미리 컴파일할 app (admin, allauth 템플릿은 자주 쓰지 않으므로 처음 요청될 때 캐시됨)
+WARM_APPS = ('blog', 'single_pages')
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def template_loaders(cached):
+    # TEMPLATES OPTIONS['loaders']. loaders를 직접 주므로 APP_DIRS는 쓰지 않음
+    if cached:
+        return [('django.template.loaders.cached.Loader', LOADERS)]
+    return list(LOADERS)
+
+
+def template_names(app_labels=WARM_APPS):
+    from django.apps import apps
+
+    names = []
+    for label in app_labels:
+        root = Path(apps.get_app_config(label).path) / 'templates'
+        for path in sorted(root.rglob('*')):
+            if path.is_file() and path.suffix in TEMPLATE_SUFFIXES:
+                names.append(path.relative_to(root).as_posix())
+    return names
+
+
+def uses_cached_loader(engine):
+    from django.template.loaders.cached import Loader
+
+    return any(isinstance(loader, Loader) for loader in engine.template_loaders)
+
+
+def warm_templates(app_labels=WARM_APPS):
+    # app_labels의 템플릿을 cached loader에 컴파일해 두고 그 수를 돌려줌 (cached loader가 아니면 0).
+    # 깨진 템플릿은 첫 요청이 아니라 여기(worker 시작)에서 에러가 남
+    from django.template import engines
+
+    engine = engines['django'].engine
+    if not uses_cached_loader(engine):
+        return 0
+    names = template_names(app_labels)
+    for name in names:
+        engine.get_template(name)
+    return len(names)
@@ -13,11 +13,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 
 from django.conf import settings
-from django.conf.urls.static import static
+
+from . import media
 
 urlpatterns = [
     path('blog/', include('blog.urls')),
@@ -27,4 +30,7 @@ urlpatterns = [
     path('', include('single_pages.urls')),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    # DEBUG일 때만 동작하는 static()과 달리 운영에서도 씀. MEDIA_ACCEL이면 파일 전송은 앞단 서버가 함
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), media.serve_media),
+]
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from .startup import boot
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'do_it_django_prj.settings')
+# 운영 설정이 기본. 개발 서버(manage.py runserver)는 manage.py가 정한 dev 설정을 씀
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'do_it_django_prj.settings.prod')
 
-application = get_wsgi_application()
+# django.setup()과 URLconf, 템플릿을 worker가 요청을 받기 전에 준비하고 걸린 시간을 확인 (startup.py)
+application = boot('django.core.wsgi.get_wsgi_application')
+
+if os.environ.get('DJANGO_MEDIA_PROXY') == '1':
+    # nginx 없이 DJANGO_MEDIA_ACCEL을 켜고 돌려볼 때 X-Accel-Redirect/X-Sendfile을 대신 처리
+    from .media import SendfileProxy
+    application = SendfileProxy(application)
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
     path('about_me/', views.about_me),
-    path('', views.landing),
+    path('', views.landing_async if settings.BLOG_ASYNC_VIEWS else views.landing),
 ]
\ No newline at end of file
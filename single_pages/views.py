@@ -1,10 +1,14 @@
 from django.shortcuts import render
 from blog.models import Post
+from blog.avatars import prefetch_avatar_urls
+from blog.cache import anonymous_page_cache, async_cached_view, list_page_versions
 
 # Create your views here.
 
+@anonymous_page_cache(list_page_versions)
 def landing(request):
-    recent_posts = Post.objects.order_by('-pk')[:3]
+    recent_posts = list(Post.objects.select_related('author').order_by('-pk')[:3])
+    prefetch_avatar_urls([post.author for post in recent_posts])
     return render(
         request,
         'single_pages/landing.html',
@@ -13,6 +17,9 @@ def landing(request):
         }
     )
 
+# ASGI용 (settings.BLOG_ASYNC_VIEWS)
+landing_async = async_cached_view(landing, list_page_versions)
+
 def about_me(request):
     return render(
         request,